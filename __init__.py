@@ -12,40 +12,480 @@ turingAPI documents: [https://xbz-studio.gitbook.io/turingapi](https://xbz-studi
 by [xbzstudio](https://xbz-studio.gitbook.io)
 '''
 
-import urllib3, urllib.parse, httpx, warnings
-from typing import Union
+import urllib.parse, httpx, warnings, asyncio, concurrent.futures, contextlib, types, collections, inspect, time
+from typing import Union, NamedTuple, Mapping
+from .cache import ResponseCache, MISSING
+from .assets import AssetStore
+from .codec import JSONDecoder
+from .columns import ColumnCollector
+from .metrics import Metrics, Sample
+from .hooks import Event, HOOK_KINDS
+from .session import SessionFile
+from .multipart import MultipartEncoder
+from .ratelimit import RateLimiter, RetryPolicy, THROTTLE_STATUSES, retryAfterOf
+from .records import RECORDS, Record, Work, WorkDetail, Comment, Reply, Message, PersonInfo, structOf
+from .transport import ENDPOINTS, RAW, EXISTS, Call, Endpoint
 
 DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36 Edg/115.0.1901.203'
 
+DEFAULT_HOST_LIMITS = {
+    'icodeshequ.youdao.com' : 20,
+    'icode.youdao.com' : 10,
+    'ydschool-online.nosdn.127.net' : 20
+}
+
+def buildClient(clientClass : type = httpx.Client,
+                timeout : Union[int, float] = 10,
+                maxConnections : int = 100,
+                maxKeepalive : int = 20,
+                keepaliveExpiry : Union[int, float] = 5,
+                http2 : bool = False,
+                hostLimits : dict = DEFAULT_HOST_LIMITS):
+    '''
+    Build a httpx client with its own connection pool.
+
+    `clientClass` should be `httpx.Client` or `httpx.AsyncClient`.
+
+    `hostLimits` maps a host to the max connections of that host, every host in it gets a separate pool,
+    other hosts share a pool limited by `maxConnections`. `http2` needs the `h2` package.
+    '''
+    transportClass = httpx.AsyncHTTPTransport if issubclass(clientClass, httpx.AsyncClient) else httpx.HTTPTransport
+    mounts = {}
+    for host, limit in (hostLimits or {}).items():
+        limits = httpx.Limits(max_connections = limit, max_keepalive_connections = min(limit, maxKeepalive), keepalive_expiry = keepaliveExpiry)
+        mounts[f'all://{host}'] = transportClass(limits = limits, http2 = http2)
+    limits = httpx.Limits(max_connections = maxConnections, max_keepalive_connections = maxKeepalive, keepalive_expiry = keepaliveExpiry)
+    return clientClass(timeout = timeout, limits = limits, http2 = http2, mounts = mounts)
+
+class Identity(NamedTuple):
+    '''
+    The login identity of a user: cookie, user agent and the user info returned by `login`.
+
+    An Identity never changes, a login or a new cookie replaces the whole Identity.
+    '''
+    cookie : bytes = b''
+    userAgent : str = DEFAULT_USER_AGENT
+    info : dict = {}
+    loginStatus : bool = False
+    headers : Mapping = types.MappingProxyType({})
+
+    @classmethod
+    def create(cls, cookie : bytes, userAgent : str = DEFAULT_USER_AGENT) -> 'Identity':
+        return cls(cookie, userAgent, headers = types.MappingProxyType({'User-Agent' : userAgent, 'Cookie' : cookie}))
+
 class LoginWarning(Warning):
     pass
 
 class LoginError(Exception):
     pass
 
+class BatchResult():
+    '''
+    A result of `AsyncIcodeAPI.gatherMany`.
+
+    `item` is the input item, `result` is the return value of the call, `error` is the exception raised by the call or None.
+    '''
+    __slots__ = ('item', 'result', 'error')
+
+    def __init__(self, item, result = None, error : Exception = None):
+        self.item = item
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self):
+        if self.ok:
+            return f'BatchResult(item={self.item!r}, result={self.result!r})'
+        return f'BatchResult(item={self.item!r}, error={self.error!r})'
+
+def _writerOf(out):
+    '''
+    The function to write chunks to `out`, a file-like object or a function.
+    '''
+    return out if callable(out) else out.write
+
+async def _aiterItems(items):
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
 class IcodeAPI():
     '''
         Create a icodeshequ user.
 
         Go to https://icodeshequ.youdao.com to get your cookies.
     '''
-    __cookie : str = ''
-    userAgent : str = DEFAULT_USER_AGENT
-    __info : dict = {}
+    _identity : Identity = Identity()
     client : httpx.Client = None
-    __loginStatus = False
+    _ownClient : bool = False
+    _clientClass : type = httpx.Client
+    cache : ResponseCache = None
+    assetStore : AssetStore = None
+    decoder : JSONDecoder = None
+    records : Union[bool, str] = False
+    rateLimiter : RateLimiter = None
+    retry : RetryPolicy = None
+    metrics : Metrics = None
+    hooks : dict = None
+    session : SessionFile = None
+    _loginPending : bool = False
+
+    def __init__(self, cookie : str = '', userAgent : str = DEFAULT_USER_AGENT, httpxClient : httpx.Client = None, timeout : Union[int, float] = 10,
+                 maxConnections : int = 100, maxKeepalive : int = 20, keepaliveExpiry : Union[int, float] = 5, http2 : bool = False,
+                 hostLimits : dict = DEFAULT_HOST_LIMITS, cache : Union[bool, ResponseCache] = False, assetStore : AssetStore = None,
+                 jsonDecoder : Union[str, JSONDecoder] = None, records : Union[bool, str] = False,
+                 rateLimiter : Union[bool, RateLimiter] = None, retry : Union[bool, RetryPolicy] = True,
+                 metrics : Union[bool, Metrics] = None, hooks : dict = None, lazyLogin : bool = False, session : Union[str, SessionFile] = None):
+        '''
+        If `httpxClient` is None, the user gets its own connection pool built by `buildClient`,
+        and the pool is closed with the user. A given `httpxClient` is shared and never closed by the user.
+
+        If `cache` is True or a `ResponseCache`, the results of `getPersonInfo`, `getWorkDetail(addBrowseNum = False)`,
+        `getWorkSubmitInfo` and `getMoreWorks` are cached, and writes like `comment` or `deleteWork` drop the results they change.
+        A `ResponseCache` can be shared by users, the results are kept per cookie, a write drops the changed results of every user.
+
+        If `assetStore` is an `AssetStore`, `getScratchAsset` reads assets from it first and stores downloaded assets in it.
+
+        `jsonDecoder` is a `JSONDecoder` or the name of its backend (`'orjson'`, `'msgspec'` or `'json'`),
+        if None the fastest installed backend is used.
+
+        If `records` is True, the read APIs return the slotted records of the `records` module instead of dicts,
+        if `records` is `'msgspec'`, they return msgspec structs with the same fields, decoded straight from the response.
+        Both can be read like dicts. Every read API also has a `records` parameter to choose it per call.
+
+        If `rateLimiter` is True, requests wait for the token bucket of their host in `RateLimiter.shared()`,
+        shared by all users in the process. It can also be an own `RateLimiter`.
+        `retry` is the `RetryPolicy`, by default GET requests are retried 3 times on 429, 5xx and connection errors
+        with jittered backoff, False never retries. A request failing with 5xx (after the retries) raises `httpx.HTTPStatusError`.
+
+        If `metrics` is True or a `Metrics`, every call is measured per endpoint, see `Metrics.snapshot`.
+
+        `hooks` is like `{'request': [...], 'response': [...], 'error': [...]}`, every hook is called with an `Event`
+        before each attempt of a call, after its response, or when it raises. See `addHook`.
+
+        If `lazyLogin` is True, the user doesn't login when created, but on its first call which needs login, or on `ensureLogin`.
+        If `session` is a path or a `SessionFile`, a successful login is saved in it, and the next login with the same cookie
+        (or an empty cookie) reads it instead of sending a request, until it expires.
+        '''
+        self._setup(cookie, userAgent, httpxClient, timeout, maxConnections, maxKeepalive, keepaliveExpiry, http2, hostLimits, cache, assetStore, jsonDecoder, records, rateLimiter, retry, metrics, hooks, lazyLogin, session)
+        if not lazyLogin:
+            self.login()
+
+    def _setup(self, cookie, userAgent, httpxClient, timeout, maxConnections, maxKeepalive, keepaliveExpiry, http2, hostLimits, cache, assetStore, jsonDecoder, records, rateLimiter, retry, metrics, hooks, lazyLogin, session):
+        if httpxClient is None:
+            self.client = buildClient(self._clientClass, timeout, maxConnections, maxKeepalive, keepaliveExpiry, http2, hostLimits)
+            self._ownClient = True
+        else:
+            self.client = httpxClient
+            self.client.timeout = timeout
+        self._setIdentity(Identity.create(cookie.encode('utf-8'), userAgent))
+        self.cache = ResponseCache() if cache is True else (cache if isinstance(cache, ResponseCache) else None)
+        self.assetStore = assetStore
+        self.decoder = jsonDecoder if isinstance(jsonDecoder, JSONDecoder) else JSONDecoder(jsonDecoder)
+        self.records = records
+        self.rateLimiter = RateLimiter.shared() if rateLimiter is True else (rateLimiter or None)
+        self.retry = RetryPolicy() if retry is True else (retry or None)
+        self.metrics = Metrics() if metrics is True else (metrics or None)
+        for kind, funcs in (hooks or {}).items():
+            for func in funcs:
+                self.addHook(kind, func)
+        self.session = SessionFile(session) if isinstance(session, str) else session
+        self._loginPending = lazyLogin
+
+    @property
+    def userAgent(self) -> str:
+        return self._identity.userAgent
+
+    @userAgent.setter
+    def userAgent(self, userAgent : str):
+        self._setIdentity(Identity.create(self._identity.cookie, userAgent))
+
+    def addHook(self, kind : str, hook):
+        '''
+        Call `hook(event)` on the `kind` event of every request, `kind` is "request", "response" or "error".
+
+        The event is an `Event` with the endpoint name, its parameters (like the work ID, also when it is in the path or the json body), the timing and the response size.
+        With AsyncIcodeAPI, a hook can be an async function.
+        '''
+        if kind not in HOOK_KINDS:
+            raise ValueError(f'kind must be "request" or "response" or "error", not {kind}')
+        if self.hooks is None:
+            self.hooks = {i : [] for i in HOOK_KINDS}
+        self.hooks[kind].append(hook)
+
+    def removeHook(self, kind : str, hook):
+        if self.hooks is not None and hook in self.hooks.get(kind, ()):
+            self.hooks[kind].remove(hook)
+
+    def _emit(self, kind : str, event : Event):
+        for hook in self.hooks[kind]:
+            hook(event)
+
+    def getIdentity(self) -> Identity:
+        return self._identity
 
-    def __init__(self, cookie : str = '', userAgent : str = DEFAULT_USER_AGENT, httpxClient : httpx.Client = httpx.Client(), timeout : Union[int, float] = 10):
-        self.__cookie = cookie.encode('utf-8')
-        self.userAgent = userAgent
-        self.client = httpxClient
-        self.client.timeout = timeout
-        self.login()
+    def _setIdentity(self, identity : Identity):
+        '''
+        Replace the identity, the base headers are installed on the client if the user owns it.
+        '''
+        if self._ownClient and identity.headers is not self._identity.headers:
+            self.client.headers.update(identity.headers)
+        self._identity = identity
+
+    def _call(self, name : str, *values, records : Union[bool, str] = None, **options) -> Call:
+        '''
+        Prepare a call of the endpoint `name`, see `transport.Call`.
+
+        `records` overrides the `records` of the user for this call.
+        '''
+        endpoint = ENDPOINTS[name]
+        call = Call(endpoint, endpoint.format(*values), **options)
+        records = self.records if records is None else records
+        if records and call.fields is None and (record := RECORDS.get(name)) is not None:
+            call.record = structOf(record) if records == 'msgspec' else record
+            if call.cacheKey is not None:
+                call.cacheKey += (call.record,)
+        return call
+
+    def _workDetailCall(self, workId : str, addBrowseNum : bool, fields : tuple = None, records : Union[bool, str] = None) -> Call:
+        fields = tuple(fields) if fields else None
+        return self._call('getWorkDetail', workId, str(addBrowseNum).lower(), fields = fields, records = records, params = {'workId' : workId},
+                          cacheKey = ('getWorkDetail', workId) + ((fields,) if fields else ()), cacheRead = not addBrowseNum, coalesce = not addBrowseNum)
+
+    def _prepare(self, call : Call):
+        '''
+        Check the login status and the cache before sending `call`, return the cached result or `MISSING`.
+        '''
+        if call.endpoint.login and not self.getLoginStatus():
+            raise LoginError('User is not logged in')
+        if call.cacheKey is not None and call.cacheRead:
+            return self._cacheGet(*call.cacheKey)
+        return MISSING
+
+    def _finish(self, call : Call, response : httpx.Response):
+        '''
+        Get the result of `call` from its response, then update the cache.
+
+        A 5xx response, or a 4xx response which is not JSON (like an HTML error page), raises `httpx.HTTPStatusError`,
+        a 4xx JSON response is the error result of the API and is decoded.
+        '''
+        key = call.endpoint.key
+        if key is RAW:
+            response.raise_for_status()
+            result = response.content
+        elif key is EXISTS:
+            if response.status_code != 404:
+                response.raise_for_status()
+            result = response.status_code != 404
+        else:
+            if response.is_server_error or (response.is_client_error and 'json' not in response.headers.get('Content-Type', '')):
+                response.raise_for_status()
+            if call.record is not None:
+                result = self.decoder.decodeRecords(response.content, key, call.record)
+            else:
+                result = self.decoder.decode(response.content, key, call.fields)
+        if call.cacheKey is not None:
+            self._cachePut(result, *call.cacheKey)
+        if call.invalidate is not None:
+            self._invalidate(*call.invalidate)
+        return result
+
+    def _headersOf(self, call : Call) -> Mapping:
+        '''
+        The headers to send with `call`. The base headers are already on an owned client,
+        a shared client gets them with every request, per-call headers are chained in front without copying.
+        '''
+        if self._ownClient:
+            return call.headers
+        if call.headers is None:
+            return self._identity.headers
+        return collections.ChainMap(call.headers, self._identity.headers)
+
+    def _request(self, call : Call):
+        '''
+        The request engine, send `call` and return its result.
+        '''
+        if self._loginPending and call.endpoint.login:
+            self.login()
+        if (result := self._prepare(call)) is not MISSING:
+            if self.metrics is not None:
+                self.metrics.cacheHit(call.endpoint.name)
+            return result
+        return self._finish(call, self._send(call))
+
+    def _retryDelay(self, call : Call, attempt : int, response : httpx.Response = None, error : Exception = None) -> float:
+        '''
+        Feed the rate limiter with the response of `call`, return the seconds to wait before sending it again,
+        or None if it is not retried.
+        '''
+        if response is not None and self.rateLimiter is not None:
+            retryAfter = retryAfterOf(response) if response.status_code in THROTTLE_STATUSES else None
+            self.rateLimiter.feedback(call.endpoint.host, response.status_code, retryAfter)
+        if self.retry is None or not self.retry.shouldRetry(call.endpoint.method, attempt, response, error):
+            return None
+        return self.retry.delay(attempt, response)
+
+    def _attempt(self, call : Call, attempt : int, extensions : dict = None) -> httpx.Response:
+        '''
+        Send `call` once, with the hooks.
+        '''
+        if self.hooks is None:
+            return self.client.request(call.endpoint.method, call.url, headers = self._headersOf(call), json = call.json, content = call.content,
+                                       extensions = extensions)
+        event = Event(call, attempt, call.params)
+        self._emit('request', event)
+        try:
+            response = self.client.request(call.endpoint.method, call.url, headers = self._headersOf(call), json = call.json, content = call.content,
+                                           extensions = extensions)
+        except Exception as e:
+            event.finish(error = e)
+            self._emit('error', event)
+            raise
+        event.finish(response)
+        self._emit('response', event)
+        return response
+
+    def _send(self, call : Call) -> httpx.Response:
+        '''
+        Send `call` when the rate limiter allows it, and again by the retry policy.
+        '''
+        sample = None if self.metrics is None else self.metrics.start(call.endpoint)
+        extensions = None if sample is None else {'trace' : sample.trace}
+        attempt = 0
+        try:
+            while True:
+                if self.rateLimiter is not None:
+                    self.rateLimiter.wait(call.endpoint.host)
+                if sample is not None:
+                    sample.attempt()
+                try:
+                    response = self._attempt(call, attempt, extensions)
+                except httpx.TransportError as e:
+                    if (delay := self._retryDelay(call, attempt, error = e)) is None:
+                        raise
+                else:
+                    if (delay := self._retryDelay(call, attempt, response)) is None:
+                        break
+                    response.close()
+                attempt += 1
+                time.sleep(delay)
+        except BaseException as e:
+            if sample is not None:
+                sample.retries = attempt
+                self.metrics.finish(sample, error = e)
+            raise
+        if sample is not None:
+            sample.retries = attempt
+            self.metrics.finish(sample, response)
+        return response
+
+    def _stream(self, call : Call, out, chunkSize : int) -> int:
+        '''
+        Send `call` and write its response body to `out` in chunks, return the size of the body.
+
+        Like `_send`, it waits for the rate limiter and is sent again by the retry policy,
+        but only until the first chunk is written to `out`.
+        '''
+        if self._loginPending and call.endpoint.login:
+            self.login()
+        self._prepare(call)
+        write = _writerOf(out)
+        size = 0
+        sample = None if self.metrics is None else self.metrics.start(call.endpoint)
+        extensions = None if sample is None else {'trace' : sample.trace}
+        attempt = 0
+        try:
+            while True:
+                if self.rateLimiter is not None:
+                    self.rateLimiter.wait(call.endpoint.host)
+                if sample is not None:
+                    sample.attempt()
+                event = None if self.hooks is None else Event(call, attempt, call.params)
+                if event is not None:
+                    self._emit('request', event)
+                try:
+                    with self.client.stream(call.endpoint.method, call.url, headers = self._headersOf(call), json = call.json, content = call.content,
+                                            extensions = extensions) as response:
+                        if (delay := self._retryDelay(call, attempt, response)) is None:
+                            response.raise_for_status()
+                            for chunk in response.iter_bytes(chunkSize):
+                                write(chunk)
+                                size += len(chunk)
+                except Exception as e:
+                    if event is not None:
+                        event.finish(error = e)
+                        self._emit('error', event)
+                    if size or not isinstance(e, httpx.TransportError) or (delay := self._retryDelay(call, attempt, error = e)) is None:
+                        raise
+                else:
+                    if event is not None:
+                        event.finish(response)
+                        self._emit('response', event)
+                    if delay is None:
+                        break
+                attempt += 1
+                time.sleep(delay)
+        except BaseException as e:
+            if sample is not None:
+                sample.retries = attempt
+                self.metrics.finish(sample, error = e)
+            raise
+        if sample is not None:
+            sample.retries = attempt
+            self.metrics.finish(sample, response)
+        return size
+
+    def _run(self, flow):
+        '''
+        Run a flow, a generator which yields calls and gets their results, return the return value of the flow.
+        '''
+        try:
+            call = next(flow)
+            while True:
+                call = flow.send(self._request(call))
+        except StopIteration as e:
+            return e.value
+
+    def _login(self, newCookie : str = None):
+        if newCookie:
+            self._setIdentity(Identity.create(newCookie.encode('utf-8'), self._identity.userAgent))
+        identity = self._identity
+        if self.session is not None and (saved := self.session.load(identity.cookie)) is not None:
+            if saved['cookie'] != identity.cookie:
+                identity = Identity.create(saved['cookie'], identity.userAgent)
+            self._setIdentity(identity._replace(info = saved['info'], loginStatus = True))
+            self._loginPending = False
+            return saved['info']
+        data = yield self._call('login')
+        if not data.get('code'):
+            result = data.get('data')
+            loginStatus = True
+            if self.session is not None:
+                self.session.save(identity.cookie, result)
+        else:
+            result = {}
+            warnings.warn('Login failed', LoginWarning)
+            loginStatus = False
+        self._setIdentity(identity._replace(info = result, loginStatus = loginStatus))
+        self._loginPending = False
+        return result
 
+    def _getMoreWorks(self, userId : str = None, workId : str = None, records : Union[bool, str] = None):
+        if not (userId or workId):
+            raise ValueError('Both userId and workId are None')
+        if userId == None:
+            userId = (yield self._workDetailCall(workId, True, ('userId',)))['userId']
+        return (yield self._call('getMoreWorks', userId, '21a8bbf470ef4203abd549c641aac7a6', params = {'userId' : userId}, cacheKey = ('getMoreWorks', userId), records = records))
 
     def login(self, newCookie : str = None) -> dict:
         '''
-        Login to https://icodeshequ.youdao.com use self.__cookie.
+        Login to https://icodeshequ.youdao.com use the cookie of the user.
 
         This function will return a dict, and the dict always be like:
         ```python
@@ -62,32 +502,56 @@ class IcodeAPI():
             }
         ```
         '''
-        if newCookie:
-            self.__cookie = newCookie.encode('utf-8')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get('https://icodecontest-online-api.youdao.com/api/user/info', headers = headers)
-        if not (data := response.json()).get('code'):
-            result = data.get('data')
-            self.__loginStatus = True
-            self.__info = result
-            return result
-        else:
-            result = {}
-            warnings.warn('Login failed', LoginWarning)
-            self.__loginStatus = False
-            self.__info = result
-            return result
-        
+        return self._run(self._login(newCookie))
+
+    def ensureLogin(self) -> bool:
+        '''
+        Login now if the login is deferred (see `lazyLogin`) and not done yet, return the login status.
+        '''
+        if self._loginPending:
+            self.login()
+        return self.getLoginStatus()
+
     def getLoginStatus(self):
-        return self.__loginStatus
-    
+        return self._identity.loginStatus
+
     def getInfo(self):
-        return self.__info
-    
-    def getWorkDetail(self, workId : str, addBrowseNum : bool = True) -> dict:
+        return self._identity.info
+
+    def _cacheKey(self, key : tuple) -> tuple:
+        '''
+        The key of a result in the cache, the cookie follows the endpoint name, so a shared cache keeps every user apart.
+        '''
+        return (key[0], self._identity.cookie) + key[1:]
+
+    def _cacheGet(self, *key):
+        if self.cache is None:
+            return MISSING
+        return self.cache.get(self._cacheKey(key))
+
+    def _cachePut(self, result, *key):
+        if self.cache is not None and result is not None:
+            self.cache.put(self._cacheKey(key), result)
+        return result
+
+    def _invalidate(self, workId : str = None, me : bool = False):
+        '''
+        Drop the cached results changed by a write to `workId`, or to the logged in user if `me`.
+        '''
+        if self.cache is None:
+            return
+        if workId:
+            self.cache.invalidate(workId)
+        if me and (userId := (self.getInfo() or {}).get('userId')):
+            self.cache.invalidate(userId)
+
+    def getWorkDetail(self, workId : str, addBrowseNum : bool = True, fields : tuple = None, records : Union[bool, str] = None) -> dict:
         '''
         Get work detail.
 
+        If `fields` is a tuple of field names like `('title', 'userId')`, only these fields are decoded and returned,
+        with msgspec installed the large `code` is never built if it isn't in `fields`.
+
         This function will return a dict, and the dict always be like:
         ```python
         {
@@ -122,12 +586,9 @@ class IcodeAPI():
         }
         ```
     '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icodeshequ.youdao.com/api/works/detail?id={workId}&addBrowseNum={str(addBrowseNum).lower()}', headers = headers)
-        result = response.json()['data']
-        return result
-    
-    def getWorkComments(self, workId : str, page : int = 1, getNum : int = 20) -> list:
+        return self._request(self._workDetailCall(workId, addBrowseNum, fields, records))
+
+    def getWorkComments(self, workId : str, page : int = 1, getNum : int = 20, records : Union[bool, str] = None) -> list:
         '''
         Get work comments.
         
@@ -149,12 +610,9 @@ class IcodeAPI():
         ]
         ```
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icodeshequ.youdao.com/api/works/comment/list?id={workId}&page={page}&size={getNum}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
-    def getMoreWorks(self, userId : str = None, workId : str = None) -> list:
+        return self._request(self._call('getWorkComments', workId, page, getNum, params = {'workId' : workId}, records = records))
+
+    def getMoreWorks(self, userId : str = None, workId : str = None, records : Union[bool, str] = None) -> list:
         '''
         Get more works.
 
@@ -173,20 +631,9 @@ class IcodeAPI():
         ]
         ```
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        if userId or workId:
-            if userId == None:
-                userId = self.getWorkDetail(workId)['userId']
-                response = self.client.get(f'https://icodeshequ.youdao.com/api/user/more_works/list?userId={userId}&currentWorksId=21a8bbf470ef4203abd549c641aac7a6')
-                result = response.json().get('dataList')
-            else:
-                response = self.client.get(f'https://icodeshequ.youdao.com/api/user/more_works/list?userId={userId}&currentWorksId=21a8bbf470ef4203abd549c641aac7a6', headers = headers)
-                result = response.json().get('dataList')
-            return result
-        else:
-            raise ValueError('Both userId and workId are None')
-        
-    def getWorks(self, page : int = 1, getNum : int = 20, sortType : int = 2, theme : str = 'all', codeLanguage : str = 'all', keyword : Union[str, any] = '') -> list:
+        return self._run(self._getMoreWorks(userId, workId, records))
+
+    def getWorks(self, page : int = 1, getNum : int = 20, sortType : int = 2, theme : str = 'all', codeLanguage : str = 'all', keyword : Union[str, any] = '', records : Union[bool, str] = None) -> list:
         '''
         Get works.
         
@@ -248,12 +695,9 @@ class IcodeAPI():
             ]
         ```
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icodeshequ.youdao.com/api/index/works/list?page={page}&size={getNum}&sortType={sortType}&theme={theme}&codeLanguage={codeLanguage}&keyword={keyword}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
-    def getMyWorks(self, page : int = 1, getNum : int = 20, theme : str = 'all', codeLanguage : str = 'all', status : int = 2, keyword : Union[str, any] = '') -> list:
+        return self._request(self._call('getWorks', page, getNum, sortType, theme, codeLanguage, keyword, records = records))
+
+    def getMyWorks(self, page : int = 1, getNum : int = 20, theme : str = 'all', codeLanguage : str = 'all', status : int = 2, keyword : Union[str, any] = '', records : Union[bool, str] = None) -> list:
         '''
         Get user works.
 
@@ -320,13 +764,8 @@ class IcodeAPI():
         ]
         ```
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icodeshequ.youdao.com/api/user/works/list?page={page}&size={getNum}&status={status}&theme={theme}&codeLanguage={codeLanguage}&keyword={keyword}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
+        return self._request(self._call('getMyWorks', page, getNum, status, theme, codeLanguage, keyword, records = records))
+
     def getWorkSubmitInfo(self, workId : str) -> dict:
         '''
         Get work submit info.
@@ -392,12 +831,9 @@ class IcodeAPI():
         }
         ```
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icode.youdao.com/api/work/get?id={workId}', headers = headers)
-        result = response.json()
-        return result
-    
-    def getPersonInfo(self, userId : str) -> dict:
+        return self._request(self._call('getWorkSubmitInfo', workId, params = {'workId' : workId}, cacheKey = ('getWorkSubmitInfo', workId)))
+
+    def getPersonInfo(self, userId : str, records : Union[bool, str] = None) -> dict:
         '''
         Get user info.
 
@@ -416,12 +852,9 @@ class IcodeAPI():
         }
         ```
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icodeshequ.youdao.com/api/user/index/hisStatics?userId={userId}', headers = headers)
-        result = response.json().get('data')
-        return result
+        return self._request(self._call('getPersonInfo', userId, params = {'userId' : userId}, cacheKey = ('getPersonInfo', userId), records = records))
 
-    def getPersonWorks(self, userId : str, page : int = 1, getNum : int = 20) -> list:
+    def getPersonWorks(self, userId : str, page : int = 1, getNum : int = 20, records : Union[bool, str] = None) -> list:
         '''
         Get user works.
 
@@ -446,12 +879,9 @@ class IcodeAPI():
         ]
         ```
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icodeshequ.youdao.com/api/user/works/hisWorksList?page={page}&size={getNum}&userId={userId}', headers = headers)
-        result = response.json().get('dataList')
-        return result
+        return self._request(self._call('getPersonWorks', page, getNum, userId, params = {'userId' : userId}, records = records))
 
-    def getPersonEnshrines(self, userId : str, page : int = 1, getNum : int = 20) -> list:
+    def getPersonEnshrines(self, userId : str, page : int = 1, getNum : int = 20, records : Union[bool, str] = None) -> list:
         '''
         Get user enshrines.
 
@@ -475,12 +905,9 @@ class IcodeAPI():
         ]
         ```
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icodeshequ.youdao.com/api/user/works/hisEnshrines?page={page}&size={getNum}&userId={userId}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
-    def getReplies(self, commentId : int, page : int = 1, getNum : int = 20) -> list:
+        return self._request(self._call('getPersonEnshrines', page, getNum, userId, params = {'userId' : userId}, records = records))
+
+    def getReplies(self, commentId : int, page : int = 1, getNum : int = 20, records : Union[bool, str] = None) -> list:
         '''
         Get the replies of a comment.
 
@@ -521,12 +948,9 @@ class IcodeAPI():
         ]
         ```
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://icodeshequ.youdao.com/api/works/reply/list?commentId={commentId}&page={page}&size={getNum}', headers  = self.headers)
-        result = response.json()['dataList']
-        return result
-    
-    def getMessages(self, messageType : str = 'reply', page : int = 1, getNum : int = 20) -> list:
+        return self._request(self._call('getReplies', commentId, page, getNum, params = {'commentId' : commentId}, records = records))
+
+    def getMessages(self, messageType : str = 'reply', page : int = 1, getNum : int = 20, records : Union[bool, str] = None) -> list:
         '''
         Get the reply messages in messgaes hub.
 
@@ -564,75 +988,83 @@ class IcodeAPI():
         ]
         ```
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        match messageType:
-            case 'reply':
-                response = self.client.get(f'https://icodeshequ.youdao.com/api/user/message/commentMessage?page={page}&size={getNum}', headers = headers)
-            case 'enshrine':
-                response = self.client.get(f'https://icodeshequ.youdao.com/api/user/message/enshrinesMessage?page={page}&size={getNum}', headers = headers)
-            case 'system':
-                response = self.client.get(f'https://icodeshequ.youdao.com/api/user/message/systemMessage?page={page}&size={getNum}', headers = headers)
-            case _:
-                raise ValueError(f'messageType must be "reply" or "enshrine" or "system", not {messageType}')
-        result = response.json().get('dataList')
-        return result
+        if messageType not in ('reply', 'enshrine', 'system'):
+            raise ValueError(f'messageType must be "reply" or "enshrine" or "system", not {messageType}')
+        return self._request(self._call(f'getMessages.{messageType}', page, getNum, records = records))
 
     def getScratchAsset(self, md5ext : str):
         '''
         Get asset in scratch work.
         '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.get(f'https://ydschool-online.nosdn.127.net/svg/{md5ext}', headers = headers)
-        result = response.content
+        if self.assetStore is not None and (result := self.assetStore.get(md5ext)) is not None:
+            return result
+        result = self._request(self._call('getScratchAsset', md5ext, params = {'md5ext' : md5ext}))
+        if self.assetStore is not None:
+            self.assetStore.put(md5ext, result)
         return result
-    
+
+    def hasScratchAsset(self, md5ext : str) -> bool:
+        '''
+        Check whether an asset is on the asset host, only with a HEAD request.
+        '''
+        return self._request(self._call('hasScratchAsset', md5ext, params = {'md5ext' : md5ext}))
+
+    def streamScratchAsset(self, md5ext : str, out, chunkSize : int = 65536) -> int:
+        '''
+        Stream asset in scratch work to `out` in chunks of at most `chunkSize` bytes, return the size of the asset.
+
+        `out` is a file-like object or a function called with every chunk, the asset is never held in memory as a whole.
+        With an asset store, the asset is read from it first, and a downloaded asset is written to it at the same time.
+        '''
+        write = _writerOf(out)
+        if self.assetStore is not None and (mm := self.assetStore.open(md5ext)) is not None:
+            with mm:
+                for i in range(0, len(mm), chunkSize):
+                    write(mm[i : i + chunkSize])
+                return len(mm)
+        call = self._call('getScratchAsset', md5ext, params = {'md5ext' : md5ext})
+        if self.assetStore is None:
+            return self._stream(call, write, chunkSize)
+        with self.assetStore.writer(md5ext) as storeWrite:
+            def tee(chunk):
+                write(chunk)
+                storeWrite(chunk)
+            return self._stream(call, tee, chunkSize)
+
+    def streamWorkDetail(self, workId : str, out, addBrowseNum : bool = True, chunkSize : int = 65536) -> int:
+        '''
+        Stream the raw JSON response of `getWorkDetail` to `out`, see `streamScratchAsset`.
+
+        Use it to spool a big work to a file instead of reading the whole response into memory.
+        '''
+        return self._stream(self._call('getWorkDetail', workId, str(addBrowseNum).lower(), params = {'workId' : workId}), out, chunkSize)
+
     def comment(self, workId : str, content : str) -> dict:
         '''
         Comment a work.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
         body = {
             'id': workId,
             'content': content
         }
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        headers['Content-Type'] = 'application/json'
-        response = self.client.post('https://icodeshequ.youdao.com/api/works/comment', json = body, headers = headers)
-        result = response.json()
-        return result
-    
+        return self._request(self._call('comment', json = body, params = {'workId' : workId}, invalidate = (workId, False)))
+
     def like(self, workId : str, mode : int = 1) -> dict:
         '''
         Like a work.
 
         If mode = 1, like the work. If mode = 2, un-like the work.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        url = f'https://icodeshequ.youdao.com/api/works/like?id={workId}&type={mode}'
-        response = self.client.post(url, data = 'IcodeAPI: Like request'.encode('utf-8'), headers = headers)
-        result = response.json()
-        return result
-    
+        return self._request(self._call('like', workId, mode, params = {'workId' : workId}, invalidate = (workId, False)))
+
     def enshrine(self, workId : str, mode : int = 1) -> dict:
         '''
         Enshrine a work.
 
         If mode = 1, enshrine the work. If mode = 2, un-enshrine the work.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        urlContent = 'enshrine' if (not (mode - 1)) else 'cancelEnshrine'
-        url = f'https://icodeshequ.youdao.com/api/user/works/{urlContent}?worksId={workId}'
-        response = self.client.post(url, data = 'IcodeAPI: Enshrine request'.encode('utf-8'), headers = headers)
-        result = response.json()
-        return result
-    
+        return self._request(self._call('enshrine' if (not (mode - 1)) else 'cancelEnshrine', workId, params = {'workId' : workId}, invalidate = (workId, False)))
+
     def report(self, workId : str, reason : str, reportType : int) -> dict:
         '''
         Report a work.
@@ -644,17 +1076,12 @@ class IcodeAPI():
             4: illegal,
             5: r18 / r18g
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
         body = {'worksIdStr':workId,
                 'category':reportType,
                 'description':reason
                 }
-        response = self.client.post('https://icodeshequ.youdao.com/api/works/report', json = body, headers = headers)
-        result = response.json()
-        return result
-    
+        return self._request(self._call('report', json = body, params = {'workId' : workId}))
+
     def submitWork(self, workCode : str = '',
                    workType : str = 'Scratch', 
                    publish : int = 1,
@@ -680,188 +1107,59 @@ class IcodeAPI():
 
         If workDetail should be a tuple. workDetail[0] = `getWorkDetail()` return value, workDetail[1] = `getWorkSubmitInfo()` return value.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
         if workDetail:
-            if not workId:
-                match workDetail[0].get('codeLanguage'):
-                    case 'scratch':
-                        fields = {
-                            'category' : 'lab',
-                            'code' : workDetail[0].get('code'),
-                            'codeType' : 'json',
-                            'theme' : 'scratch',
-                            'subtheme' : 'scratch',
-                            'description' : workDetail[0].get('description'),
-                            'fork' : workDetail[1].get('fork'),
-                            'publish' : workDetail[0].get('status') % 2 + 1,
-                            'thumbnail' : workDetail[0].get('imgUrl'),
-                            'title' : workDetail[0].get('title')
-                        }
-                        fields=urllib3.encode_multipart_formdata(fields=fields)
-                        body = fields[0]
-                        headers = headers
-                        headers['Content-Type'] = fields[1]
-                        response = self.client.post('https://icode.youdao.com/api/work/submit',data = body, headers = headers)
-                    case 'python':
-                        if save:
-                            body = {
-                                'code' : workDetail[0].get('code'),
-                                'description' : workDetail[0].get('description'),
-                                'title': workDetail[0].get('title')
-                            }
-                            headers = headers
-                            headers['Content-Type'] = 'application/json'
-                            response = self.client.post('https://icodeshequ.youdao.com/api/works/save', json = body, headers = headers)
-                        else:
-                            body = {
-                                'code' : workDetail[0].get('code'),
-                                'description' : workDetail[0].get('description'),
-                                'title': workDetail[0].get('title'),
-                                'imgUrl': workDetail[0].get('imgUrl')
-                            }
-                            headers = headers
-                            headers['Content-Type'] = 'application/json'
-                            response = self.client.post(f'https://icodeshequ.youdao.com/api/works/publish?publishType={workDetail[0].get("status") % 2 + 1}', json = body, headers = headers)
-                    case _:
-                        raise ValueError('Invalid workDetail.')
-            else:
-                match workDetail[0].get('codeLanguage'):
-                    case 'scratch':
-                        fields = {
-                            'category' : 'lab',
-                            'code' : workDetail[0].get('code'),
-                            'codeType' : 'json',
-                            'theme' : 'scratch',
-                            'subtheme' : 'scratch',
-                            'description' : workDetail[0].get('description'),
-                            'fork' : workDetail[1].get('fork'),
-                            'publish' : workDetail[0].get('status') % 2 + 1,
-                            'thumbnail' : workDetail[0].get('imgUrl'),
-                            'title' : workDetail[0].get('title'),
-                            'workid' : workId
-                        }
-                        fields=urllib3.encode_multipart_formdata(fields=fields)
-                        body = fields[0]
-                        headers = headers
-                        headers['Content-Type'] = fields[1]
-                        response = self.client.post('https://icode.youdao.com/api/work/submit',data = body, headers = headers)
-                    case 'python':
-                        if save:
-                            body = {
-                                'code' : workDetail[0].get('code'),
-                                'description' : workDetail[0].get('description'),
-                                'title': workDetail[0].get('title'),
-                                'id' : workId
-                            }
-                            headers = headers
-                            headers['Content-Type'] = 'application/json'
-                            response = self.client.post('https://icodeshequ.youdao.com/api/works/save', json = body, headers = headers)
-                        else:
-                            body = {
-                                'code' : workDetail[0].get('code'),
-                                'description' : workDetail[0].get('description'),
-                                'title': workDetail[0].get('title'),
-                                'imgUrl': workDetail[0].get('imgUrl'),
-                                'id' : workId
-                            }
-                            headers = headers
-                            headers['Content-Type'] = 'application/json'
-                            response = self.client.post(f'https://icodeshequ.youdao.com/api/works/publish?publishType={workDetail[0].get("status") % 2 + 1}', json = body, headers = headers)
-                    case _:
-                        raise ValueError('Invalid workDetail.')
-            result = response.json()
-            return result
-        if not workId:
-            if workType in ['Scratch', 'scratch']:
-                fields = [("category", (None, 'lab')), ("code", (None, workCode)), ("codeType", (None, 'json')), ("theme", (None, 'scratch')),("subtheme", (None, 'scratch')),("description", (None, description)),("fork", (None, fork)),("publish", (None,publish)),("thumbnail", (None, thumbnail)),("title", (None, title))]
-                fields=urllib3.encode_multipart_formdata(fields=fields)
-                body = fields[0]
-                headers = headers
-                headers['Content-Type'] = fields[1]
-                response = self.client.post('https://icode.youdao.com/api/work/submit',data = body, headers = headers)
-            else:
-                if workType in ['Python', 'python']:
-                    if save:
-                        body = {
-                            'code' : workCode,
-                            'description' : description,
-                            'title': title
-                        }
-                        headers = headers
-                        headers['Content-Type'] = 'application/json'
-                        response = self.client.post('https://icodeshequ.youdao.com/api/works/save', json = body, headers = headers)
-                    else:
-                        body = {
-                            'code': workCode,
-                            'description': description,
-                            'title': title,
-                            'imgUrl': thumbnail
-                        }
-                        headers = headers
-                        headers['Content-Type'] = 'application/json'
-                        response = self.client.post(f'https://icodeshequ.youdao.com/api/works/publish?publishType={publish}', json = body, headers = headers)
-                else:
-                    raise ValueError(f'The workType must be "Scratch" or "Python", not {workType}')
-        else:
-            if workType in ['Scratch', 'scratch']:
-                fields = [("category", (None, 'lab')), ("code", (None, workCode)), ("codeType", (None, 'json')), ("theme", (None, 'scratch')),("subtheme", (None, 'scratch')),("description", (None, description)),("fork", (None, fork)),("publish", (None,publish)),("thumbnail", (None, thumbnail)),("title", (None, title)),('workid',(None,workId))]
-                fields=urllib3.encode_multipart_formdata(fields=fields)
-                body = fields[0]
-                headers = headers
-                headers['Content-Type'] = fields[1]
-                response = self.client.post('https://icode.youdao.com/api/work/submit', data = body, headers = headers)
-            elif workType in ['Python', 'python']:
+            workType = workDetail[0].get('codeLanguage')
+            if workType not in ('scratch', 'python'):
+                raise ValueError('Invalid workDetail.')
+            workCode = workDetail[0].get('code')
+            title = workDetail[0].get('title')
+            description = workDetail[0].get('description')
+            thumbnail = workDetail[0].get('imgUrl')
+            publish = workDetail[0].get('status') % 2 + 1
+            if workType == 'scratch':
+                fork = workDetail[1].get('fork')
+        invalidate = (workId, True)
+        params = {'workId' : workId}
+        match workType:
+            case 'Scratch' | 'scratch':
+                fields = [('category', (None, 'lab')), ('code', (None, workCode)), ('codeType', (None, 'json')), ('theme', (None, 'scratch')),
+                          ('subtheme', (None, 'scratch')), ('description', (None, description)), ('fork', (None, fork)), ('publish', (None, publish)),
+                          ('thumbnail', (None, thumbnail)), ('title', (None, title))]
+                if workId:
+                    fields.append(('workid', (None, workId)))
+                body = MultipartEncoder(fields)
+                call = self._call('submitScratch', content = body, headers = body.headers, params = params, invalidate = invalidate)
+            case 'Python' | 'python':
+                body = {
+                    'code' : workCode,
+                    'description' : description,
+                    'title': title
+                }
                 if save:
-                    body = {
-                        'code' : workCode,
-                        'description' : description,
-                        'title': title,
-                        'id': workId
-                    }
-                    headers = headers
-                    headers['Content-Type'] = 'application/json'
-                    response = self.client.post('https://icodeshequ.youdao.com/api/works/save', json = body, headers = headers)
+                    if workId:
+                        body['id'] = workId
+                    call = self._call('saveWork', json = body, params = params, invalidate = invalidate)
                 else:
-                    body = {
-                        'code': workCode,
-                        'description': description,
-                        'title': title,
-                        'imgUrl': thumbnail,
-                        'id': workId
-                    }
-                    headers = headers
-                    headers['Content-Type'] = 'application/json'
-                    response = self.client.post(f'https://icodeshequ.youdao.com/api/works/publish?publishType={publish}', json = body, headers = headers)
-            else:
+                    body['imgUrl'] = thumbnail
+                    if workId:
+                        body['id'] = workId
+                    call = self._call('publishWork', publish, json = body, params = params, invalidate = invalidate)
+            case _:
                 raise ValueError(f'The workType must be "Scratch" or "Python", not {workType}')
+        return self._request(call)
 
-        result = response.json()
-        return result
-    
     def deleteWork(self, workId : str) -> dict:
         '''
         Delete a work.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.delete(f'https://icodeshequ.youdao.com/api/works/delete?id={workId}', headers = headers)
-        reslut = response.json()
-        return reslut
-    
+        return self._request(self._call('deleteWork', workId, params = {'workId' : workId}, invalidate = (workId, True)))
+
     def updateIntro(self, intro : str = 'IcodeAPI: The Best API Framework for icodeshequ.youdao.com in Python. Document url: https://xbz-studio.gitbook.io/icodeapi'):
         '''
         Update user intro.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.post('https://icodeshequ.youdao.com/api/user/updateIntro', data = intro.encode('utf-8'), headers = headers)
-        result = response.json()
-        return result
-    
+        return self._request(self._call('updateIntro', content = intro.encode('utf-8'), invalidate = (None, True)))
+
     def reply(self, content : str, commentId : int, replyId : int = None) -> dict:
         '''
         Reply a comment.
@@ -870,98 +1168,65 @@ class IcodeAPI():
 
         If you want to reply an another reply, you should 
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
         body = {'commentId': commentId,
                 'content': content,
                 'replyId': replyId}
-        headers = headers
-        headers['Content-Type'] = 'application/json'
-        response = self.client.post('https://icodeshequ.youdao.com/api/works/reply', json = body, headers = headers)
-        result = response.json()
-        return result
-    
+        return self._request(self._call('reply', json = body, params = {'commentId' : commentId, 'replyId' : replyId}))
+
     def deleteComment(self, commentId : int = None, replyId : int = None) -> dict:
         '''
         Delete a comment.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
         if commentId:
-            response = self.client.post(f'https://icodeshequ.youdao.com/api/works/comment/delete?commentId={commentId}', data = 'IcodeAPI delete comment'.encode('utf-8'), headers = headers)
+            return self._request(self._call('deleteComment', commentId, params = {'commentId' : commentId}))
         elif replyId:
-            response = self.client.post(f'https://icodeshequ.youdao.com/api/works/reply/delete?replyId={replyId}', data = 'IcodeAPI delete reply'.encode('utf-8'), headers = headers)
+            return self._request(self._call('deleteReply', replyId, params = {'replyId' : replyId}))
         else:
             raise ValueError(f'Both commentId and replyId is None')
-        result = response.json()
-        return result
-    
+
     def deleteMessage(self, messageId : int) -> dict:
         '''
         Delete a message in message hub.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
         body = {
             'id': messageId
         }
-        headers['Content-Type'] = 'application/json'
-        response = self.client.post('https://icodeshequ.youdao.com/api/user/message/deleteComment', json = body, headers = headers)
-        result = response.json()
-        return result
-    
+        return self._request(self._call('deleteMessage', json = body, params = {'messageId' : messageId}))
+
     def uploadFile(self, name : str, suffix : str, file : Union[bytes, str]) -> dict:
         '''
         Upload file to icodeshequ.youdao.com .
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.post(f'https://tiku-outside.youdao.com/nos/scratch/asset/{name}.{suffix}/', data = file, headers = headers)
-        result = response.json()
-        return result
-    
+        if isinstance(file, str):
+            file = file.encode('utf-8')
+        return self._request(self._call('uploadFile', name, suffix, content = file, params = {'md5ext' : f'{name}.{suffix}'}))
+
     def praiseComment(self, commentId : int = None, replyId : int = None, mode : int = 1) -> dict:
         '''
         Praise a comment or reply.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
         match mode:
             case 1:
-                url = 'https://icodeshequ.youdao.com/api/works/comment/praise?'
+                action = 'praise'
             case 2:
-                url = 'https://icodeshequ.youdao.com/api/works/comment/cancelPraise?'
+                action = 'cancelPraise'
             case _:
                 raise ValueError(f'The mode must be 1 or 2, not {mode}')
         if commentId:
-            url += f'commentId={commentId}'
+            return self._request(self._call(action + 'Comment', commentId, params = {'commentId' : commentId}))
         elif replyId:
-            url = url.replace('comment', 'reply')
-            url += f'replyId={replyId}'
+            return self._request(self._call(action + 'Reply', replyId, params = {'replyId' : replyId}))
         else:
             raise ValueError(f'Both commentId and replyId is None')
-        response = self.client.post(url, data = 'IcodeAPI: praiseComment'.encode('utf-8'), headers = headers)
-        result = response.json()
-        return result
-    
+
     def readMessage(self, messageId : int) -> dict:
         '''
         Read a message in messages hub.
 
         After reading, the message will not show a red point again.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = self.client.put(f'https://icodeshequ.youdao.com/api/user/message/read?id={messageId}', headers = headers)
-        result = response.json()
-        return result
-    
+        return self._request(self._call('readMessage', messageId, params = {'messageId' : messageId}))
+
     def readAllMessages(self, tab : int = 1) -> dict:
         '''
         Read all messages in messages hub.
@@ -975,20 +1240,89 @@ class IcodeAPI():
         tab = 3:
             Read all system messages.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        headers['Content-Type'] = 'application/json'
         body = {
             "tab" : tab
         }
-        response = self.client.post('https://icodeshequ.youdao.com/api/user/message/readAll', json = body, headers = headers)
-        result = response.json()
-        return result
-    
-    def __del__(self):
+        return self._request(self._call('readAllMessages', json = body))
+
+    def _iterPages(self, fetch, getNum : int, maxItems : int = None, startPage : int = 1):
+        '''
+        Yield the items of `fetch(page)` page by page, the next page is fetched in a thread while the current page is consumed.
+
+        Stop on a page shorter than `getNum` or after `maxItems` items.
+        '''
+        page = startPage
+        count = 0
+        with concurrent.futures.ThreadPoolExecutor(1) as pool:
+            future = pool.submit(fetch, page)
+            while future is not None:
+                items = future.result() or []
+                future = None
+                if len(items) >= getNum and (maxItems is None or count + len(items) < maxItems):
+                    page += 1
+                    future = pool.submit(fetch, page)
+                for item in items:
+                    if maxItems is not None and count >= maxItems:
+                        return
+                    yield item
+                    count += 1
+
+    def iterWorks(self, getNum : int = 20, sortType : int = 2, theme : str = 'all', codeLanguage : str = 'all', keyword : Union[str, any] = '', maxItems : int = None, startPage : int = 1):
+        '''
+        Iterate works page by page, see `getWorks`.
+
+        The next page is prefetched while the current page is consumed,
+        the iteration stops on a short page or after `maxItems` works.
+        With AsyncIcodeAPI, use `async for`.
+        '''
+        return self._iterPages(lambda page: self.getWorks(page, getNum, sortType, theme, codeLanguage, keyword), getNum, maxItems, startPage)
+
+    def iterMyWorks(self, getNum : int = 20, theme : str = 'all', codeLanguage : str = 'all', status : int = 2, keyword : Union[str, any] = '', maxItems : int = None, startPage : int = 1):
+        '''
+        Iterate user works page by page, see `getMyWorks` and `iterWorks`.
+        '''
+        return self._iterPages(lambda page: self.getMyWorks(page, getNum, theme, codeLanguage, status, keyword), getNum, maxItems, startPage)
+
+    def iterPersonWorks(self, userId : str, getNum : int = 20, maxItems : int = None, startPage : int = 1):
+        '''
+        Iterate the works of a user page by page, see `getPersonWorks` and `iterWorks`.
+        '''
+        return self._iterPages(lambda page: self.getPersonWorks(userId, page, getNum), getNum, maxItems, startPage)
+
+    def iterPersonEnshrines(self, userId : str, getNum : int = 20, maxItems : int = None, startPage : int = 1):
+        '''
+        Iterate the enshrines of a user page by page, see `getPersonEnshrines` and `iterWorks`.
+        '''
+        return self._iterPages(lambda page: self.getPersonEnshrines(userId, page, getNum), getNum, maxItems, startPage)
+
+    def iterComments(self, workId : str, getNum : int = 20, maxItems : int = None, startPage : int = 1):
+        '''
+        Iterate work comments page by page, see `getWorkComments` and `iterWorks`.
+        '''
+        return self._iterPages(lambda page: self.getWorkComments(workId, page, getNum), getNum, maxItems, startPage)
+
+    def iterReplies(self, commentId : int, getNum : int = 20, maxItems : int = None, startPage : int = 1):
+        '''
+        Iterate the replies of a comment page by page, see `getReplies` and `iterWorks`.
+        '''
+        return self._iterPages(lambda page: self.getReplies(commentId, page, getNum), getNum, maxItems, startPage)
+
+    def iterMessages(self, messageType : str = 'reply', getNum : int = 20, maxItems : int = None, startPage : int = 1):
+        '''
+        Iterate the messages in messages hub page by page, see `getMessages` and `iterWorks`.
+        '''
+        return self._iterPages(lambda page: self.getMessages(messageType, page, getNum), getNum, maxItems, startPage)
+
+    def closeClient(self):
+        '''
+        Close the client.
+        '''
         self.client.close()
-    
+
+    def __del__(self):
+        if self._ownClient and self.client is not None:
+            self.client.close()
+
 class AsyncIcodeAPI(IcodeAPI):
     '''
     Async version of IcodeAPI.
@@ -1000,953 +1334,398 @@ class AsyncIcodeAPI(IcodeAPI):
     Go to https://icodeshequ.youdao.com to get your cookies.
     '''
     client : httpx.AsyncClient = None
+    _clientClass : type = httpx.AsyncClient
+    coalesce : bool = True
+    _inflight : dict = None
+    _loginTask : asyncio.Future = None
+
+    def __init__(self, cookie : str = '', userAgent : str = DEFAULT_USER_AGENT, httpxClient : httpx.AsyncClient = None, timeout : Union[float, int] = 10,
+                 maxConnections : int = 100, maxKeepalive : int = 20, keepaliveExpiry : Union[int, float] = 5, http2 : bool = False,
+                 hostLimits : dict = DEFAULT_HOST_LIMITS, cache : Union[bool, ResponseCache] = False, assetStore : AssetStore = None,
+                 jsonDecoder : Union[str, JSONDecoder] = None, records : Union[bool, str] = False,
+                 rateLimiter : Union[bool, RateLimiter] = None, retry : Union[bool, RetryPolicy] = True,
+                 metrics : Union[bool, Metrics] = None, hooks : dict = None, lazyLogin : bool = True, session : Union[str, SessionFile] = None,
+                 coalesce : bool = True):
+        '''
+        If `coalesce` is True, concurrent identical GET requests (same url and cookie) of the user share one response,
+        `getWorkDetail(addBrowseNum = True)` is never coalesced.
+
+        The login is deferred by default, it runs on the first call which needs login, or on `await login()` or `await ensureLogin()`.
+        '''
+        self.coalesce = coalesce
+        self._inflight = {}
+        self._setup(cookie, userAgent, httpxClient, timeout, maxConnections, maxKeepalive, keepaliveExpiry, http2, hostLimits, cache, assetStore, jsonDecoder, records, rateLimiter, retry, metrics, hooks, lazyLogin, session)
+
+    async def ensureLogin(self) -> bool:
+        '''
+        Login now if the login is deferred (see `lazyLogin`) and not done yet, return the login status.
+
+        Concurrent calls share one login.
+        '''
+        if self._loginPending:
+            if self._loginTask is None:
+                self._loginTask = asyncio.ensure_future(self.login())
+                def done(f):
+                    self._loginTask = None
+                    if not f.cancelled():
+                        f.exception()
+                self._loginTask.add_done_callback(done)
+            await asyncio.shield(self._loginTask)
+        return self.getLoginStatus()
+
+    async def _get(self, call : Call) -> httpx.Response:
+        '''
+        Send the GET `call`, if the same request is already in flight, wait for its response instead.
+        '''
+        if not (self.coalesce and call.coalesce):
+            return await self._send(call)
+        key = (asyncio.get_running_loop(), call.url, self._identity.cookie)
+        inflight = self._inflight
+        future = inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._send(call))
+            inflight[key] = future
+            def done(f):
+                if inflight.get(key) is f:
+                    del inflight[key]
+                if not f.cancelled():
+                    f.exception()
+            future.add_done_callback(done)
+        return await asyncio.shield(future)
+
+    async def _request(self, call : Call):
+        '''
+        The async request engine, see `IcodeAPI._request`.
+        '''
+        if self._loginPending and call.endpoint.login:
+            await self.ensureLogin()
+        if (result := self._prepare(call)) is not MISSING:
+            if self.metrics is not None:
+                self.metrics.cacheHit(call.endpoint.name)
+            return result
+        if call.endpoint.method == 'GET':
+            response = await self._get(call)
+        else:
+            response = await self._send(call)
+        return self._finish(call, response)
+
+    def _call(self, name : str, *values, **options) -> Call:
+        '''
+        Prepare a call, see `IcodeAPI._call`, a `MultipartEncoder` body is sent as its async stream.
+        '''
+        call = super()._call(name, *values, **options)
+        if isinstance(call.content, MultipartEncoder):
+            call.content = call.content.asyncStream()
+        return call
+
+    async def _emit(self, kind : str, event : Event):
+        for hook in self.hooks[kind]:
+            if inspect.isawaitable(result := hook(event)):
+                await result
+
+    async def _attempt(self, call : Call, attempt : int, extensions : dict = None) -> httpx.Response:
+        '''
+        Send `call` once, with the hooks, see `IcodeAPI._attempt`.
+        '''
+        if self.hooks is None:
+            return await self.client.request(call.endpoint.method, call.url, headers = self._headersOf(call), json = call.json, content = call.content,
+                                             extensions = extensions)
+        event = Event(call, attempt, call.params)
+        await self._emit('request', event)
+        try:
+            response = await self.client.request(call.endpoint.method, call.url, headers = self._headersOf(call), json = call.json, content = call.content,
+                                                 extensions = extensions)
+        except Exception as e:
+            event.finish(error = e)
+            await self._emit('error', event)
+            raise
+        event.finish(response)
+        await self._emit('response', event)
+        return response
+
+    async def _send(self, call : Call) -> httpx.Response:
+        '''
+        Send `call` when the rate limiter allows it, and again by the retry policy, see `IcodeAPI._send`.
+        '''
+        sample = None if self.metrics is None else self.metrics.start(call.endpoint)
+        extensions = None if sample is None else {'trace' : sample.atrace}
+        attempt = 0
+        try:
+            while True:
+                if self.rateLimiter is not None and (delay := self.rateLimiter.reserve(call.endpoint.host)) > 0:
+                    await asyncio.sleep(delay)
+                if sample is not None:
+                    sample.attempt()
+                try:
+                    response = await self._attempt(call, attempt, extensions)
+                except httpx.TransportError as e:
+                    if (delay := self._retryDelay(call, attempt, error = e)) is None:
+                        raise
+                else:
+                    if (delay := self._retryDelay(call, attempt, response)) is None:
+                        break
+                    await response.aclose()
+                attempt += 1
+                await asyncio.sleep(delay)
+        except BaseException as e:
+            if sample is not None:
+                sample.retries = attempt
+                self.metrics.finish(sample, error = e)
+            raise
+        if sample is not None:
+            sample.retries = attempt
+            self.metrics.finish(sample, response)
+        return response
+
+    async def _stream(self, call : Call, out, chunkSize : int) -> int:
+        '''
+        Send `call` and write its response body to `out` in chunks, and again by the retry policy, see `IcodeAPI._stream`.
+
+        `out` can also be an async file-like object or an async function.
+        '''
+        if self._loginPending and call.endpoint.login:
+            await self.ensureLogin()
+        self._prepare(call)
+        write = _writerOf(out)
+        size = 0
+        sample = None if self.metrics is None else self.metrics.start(call.endpoint)
+        extensions = None if sample is None else {'trace' : sample.atrace}
+        attempt = 0
+        try:
+            while True:
+                if self.rateLimiter is not None and (delay := self.rateLimiter.reserve(call.endpoint.host)) > 0:
+                    await asyncio.sleep(delay)
+                if sample is not None:
+                    sample.attempt()
+                event = None if self.hooks is None else Event(call, attempt, call.params)
+                if event is not None:
+                    await self._emit('request', event)
+                try:
+                    async with self.client.stream(call.endpoint.method, call.url, headers = self._headersOf(call), json = call.json, content = call.content,
+                                                  extensions = extensions) as response:
+                        if (delay := self._retryDelay(call, attempt, response)) is None:
+                            response.raise_for_status()
+                            async for chunk in response.aiter_bytes(chunkSize):
+                                if inspect.isawaitable(result := write(chunk)):
+                                    await result
+                                size += len(chunk)
+                except Exception as e:
+                    if event is not None:
+                        event.finish(error = e)
+                        await self._emit('error', event)
+                    if size or not isinstance(e, httpx.TransportError) or (delay := self._retryDelay(call, attempt, error = e)) is None:
+                        raise
+                else:
+                    if event is not None:
+                        event.finish(response)
+                        await self._emit('response', event)
+                    if delay is None:
+                        break
+                attempt += 1
+                await asyncio.sleep(delay)
+        except BaseException as e:
+            if sample is not None:
+                sample.retries = attempt
+                self.metrics.finish(sample, error = e)
+            raise
+        if sample is not None:
+            sample.retries = attempt
+            self.metrics.finish(sample, response)
+        return size
+
+    async def _run(self, flow):
+        '''
+        Run a flow, see `IcodeAPI._run`.
+        '''
+        try:
+            call = next(flow)
+            while True:
+                call = flow.send(await self._request(call))
+        except StopIteration as e:
+            return e.value
 
-    def __init__(self, cookie : str = '', userAgent : str = DEFAULT_USER_AGENT, httpxClient : httpx.AsyncClient = httpx.AsyncClient(), timeout : Union[float, int] = 10):
-        self.__cookie = cookie.encode('utf-8')
-        self.userAgent = userAgent
-        self.client = httpxClient
-        self.client.timeout = timeout
-
-    async def login(self, newCookie : str = None) -> dict:
+    async def getScratchAsset(self, md5ext : str):
         '''
-        Login to https://icodeshequ.youdao.com use self.__cookie.
+        Get asset in scratch work.
+        '''
+        if self.assetStore is not None and (result := await asyncio.to_thread(self.assetStore.get, md5ext)) is not None:
+            return result
+        result = await self._request(self._call('getScratchAsset', md5ext, params = {'md5ext' : md5ext}))
+        if self.assetStore is not None:
+            await asyncio.to_thread(self.assetStore.put, md5ext, result)
+        return result
 
-        This function will return a dict, and the dict always be like:
+    async def streamScratchAsset(self, md5ext : str, out, chunkSize : int = 65536) -> int:
+        '''
+        Stream asset in scratch work to `out`, see `IcodeAPI.streamScratchAsset`.
+
+        `out` can also be an async file-like object or an async function.
+        '''
+        write = _writerOf(out)
+        if self.assetStore is not None and (mm := await asyncio.to_thread(self.assetStore.open, md5ext)) is not None:
+            with mm:
+                for i in range(0, len(mm), chunkSize):
+                    if inspect.isawaitable(result := write(mm[i : i + chunkSize])):
+                        await result
+                return len(mm)
+        call = self._call('getScratchAsset', md5ext, params = {'md5ext' : md5ext})
+        if self.assetStore is None:
+            return await self._stream(call, write, chunkSize)
+        with self.assetStore.writer(md5ext) as storeWrite:
+            def tee(chunk):
+                storeWrite(chunk)
+                return write(chunk)
+            return await self._stream(call, tee, chunkSize)
+
+    async def _iterPages(self, fetch, getNum : int, maxItems : int = None, startPage : int = 1):
+        '''
+        Async version of `IcodeAPI._iterPages`, the next page is fetched in a task.
+        '''
+        page = startPage
+        count = 0
+        task = asyncio.create_task(fetch(page))
+        try:
+            while task is not None:
+                items = await task or []
+                task = None
+                if len(items) >= getNum and (maxItems is None or count + len(items) < maxItems):
+                    page += 1
+                    task = asyncio.create_task(fetch(page))
+                for item in items:
+                    if maxItems is not None and count >= maxItems:
+                        return
+                    yield item
+                    count += 1
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def gatherMany(self, func, items, concurrency : int = 10, limiter : asyncio.Semaphore = None, **kwargs):
+        '''
+        Call `func(item, **kwargs)` for every item, at most `concurrency` calls at the same time.
+
+        `items` can be an iterable or an async iterable, it is consumed lazily.
+        `limiter` is an optional semaphore shared with other batches to set a global limit.
+
+        This is an async iterator, it yields `BatchResult` in completion order.
+        An exception raised by one call is put in `BatchResult.error`, the other calls go on.
+
+        Example:
         ```python
-            {
-                'encryptionUserId': str,
-                'userId': str, 
-                'name': str, 
-                'image': str, 
-                'permissions': list, 
-                'mobile': str, 
-                'hasCourse': bool, 
-                'userIdentity': str,
-                'courseType': str
-            }
+        async for i in api.gatherMany(api.getWorkDetail, workIds, concurrency = 20, addBrowseNum = False):
+            if i.ok:
+                print(i.item, i.result.get('title'))
+            else:
+                print(i.item, i.error)
         ```
         '''
-        if newCookie:
-            self.__cookie = newCookie.encode('utf-8')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get('https://icodecontest-online-api.youdao.com/api/user/info', headers = headers)
-        if not (jsonres := response.json()).get('code'):
-            result = jsonres.get('data')
-            self.__loginStatus = True
-        else:
-            result = {}
-            warnings.warn('Login failed', LoginWarning)
-            self.__loginStatus = False
-        self.__info = result
-        return result
-    
-    def getLoginStatus(self):
-        return self.__loginStatus
-    
-    def getInfo(self):
-        return self.__info
+        if concurrency < 1:
+            raise ValueError(f'concurrency must be at least 1, not {concurrency}')
+        async def run(item):
+            try:
+                if limiter is None:
+                    return BatchResult(item, await func(item, **kwargs))
+                async with limiter:
+                    return BatchResult(item, await func(item, **kwargs))
+            except Exception as e:
+                return BatchResult(item, error = e)
+        pending = set()
+        try:
+            async for item in _aiterItems(items):
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.create_task(run(item)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
 
-    async def getWorkDetail(self, workId : str, addBrowseNum : bool = True) -> dict:
+    def gatherDetails(self, workIds, addBrowseNum : bool = True, concurrency : int = 10, limiter : asyncio.Semaphore = None, fields : tuple = None):
         '''
-        Get work detail.
+        `getWorkDetail` for many works, see `gatherMany`.
+        '''
+        return self.gatherMany(self.getWorkDetail, workIds, concurrency, limiter, addBrowseNum = addBrowseNum, fields = fields)
 
-        This function will return a dict, and the dict always be like:
-        ```python
-        {
-            'id': str, 
-            'title': str, 
-            'imgUrl': str, 
-            'description': str,
-            'type': int,
-            'userId': str,
-            'status': int,
-            'likeNum': int,
-            'browseNum': int,
-            'enshrineNum': int,
-            'code': str,
-            'userName': str, 
-            'userImage': str, 
-            'haveLiked': bool ,
-            'haveEnshrined': bool,
-            'createTimeStr': str, 
-            'updateTimeStr': str, 
-            'codeLanguage': str, 
-            'shortLink': str, 
-            'theme': str, 
-            'subTheme': str, 
-            'iframeUrl': str, 
-            'scratchFile': str, 
-            'codeType': str, 
-            'firstPopups': bool , 
-            'forkAuthorizationStatus': bool, 
-            'isFirstPublish': bool, 
-            'haveReported': bool
-        }
-        ```
-    '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icodeshequ.youdao.com/api/works/detail?id={workId}&addBrowseNum={str(addBrowseNum).lower()}', headers = headers)
-        result = response.json().get('data')
-        return result
-    
-    async def getWorkComments(self, workId : str, page : int = 1, getNum : int = 20) -> list:
-        '''
-        Get work comments.
-        
-        This function will return a list, and the list always be like:
-        ```python
-        [
-            {
-                'id': int, 
-                'content': str, 
-                'userId': str, 
-                'name': str, 
-                'image': str, 
-                'isAuthor': bool, 
-                'praiseNum': int, 
-                'replyNum': int, 
-                'time': int, 
-                'hasPraised': bool
-            }
-        ]
-        ```
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icodeshequ.youdao.com/api/works/comment/list?id={workId}&page={page}&size={getNum}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
-    async def getMoreWorks(self, userId : str = None, workId : str = None) -> list:
-        '''
-        Get more works.
-
-        This function will return a list, and the list always be like:
-        ```python
-        [
-            {
-                'id': str, 
-                'title': str, 
-                'imgUrl': str, 
-                'likeNum': int, 
-                'browseNum': int, 
-                'userName': str, 
-                'userImage': str
-            }
-        ]
-        ```
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        if userId or workId:
-            if userId == None:
-                userId = await self.getWorkDetail(workId)
-                userId = userId['userId']
-                response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/more_works/list?userId={userId}&currentWorksId=21a8bbf470ef4203abd549c641aac7a6', headers = headers)
-                result = response.json().get('dataList')
-            else:
-                response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/more_works/list?userId={userId}&currentWorksId=21a8bbf470ef4203abd549c641aac7a6', headers = headers)
-                result = response.json().get('dataList')
-            return result
-        else:
-            raise ValueError('Both userId and workId are None')
-        
-    async def getWorks(self, page : int = 1, getNum : int = 20, sortType : int = 2, theme : str = 'all', codeLanguage : str = 'all', keyword : Union[str, any] = '') -> list:
-        '''
-        Get works.
-        
-        Parameters
-        ----------
-        `page` : int, default 1
-            Page number.
-        `getNum` : int, default 20
-            Number of works per page.
-        `sortType` : int, default 1
-            Sort type.
-
-            1: Most likes
-
-            2: Newest
-        `theme` : str, default 'all'
-            Work theme in icodeshequ.
-
-            'all': All themes
-
-            'play': Games theme
-
-            'story': Story theme
-
-            'art': Art theme
-
-            'minecraft': Minecraft theme, the works about Minecraft
-
-            'scratch': Scratch works
-
-            'turtle': Python works
-        `codeLanguage` : str, default 'all'
-            The code language of works.
-
-            'all': All code language
-
-            'blockly': Blockly works
-
-            'scratch': Scratch works
-
-            'python': Python works
-        `keyword` : str, default ''
-            The key word of works.
-        ----------
-
-        This function will return a list, and the list always be like:
-        ```python
-            [
-                {
-                    'id': str, 
-                    'title': str, 
-                    'imgUrl': str, 
-                    'userId': str, 
-                    'browseNum': int, 
-                    'userName': str, 
-                    'userImage': str, 
-                    'codeLanguage': str
-                }
-            ]
-        ```
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icodeshequ.youdao.com/api/index/works/list?page={page}&size={getNum}&sortType={sortType}&theme={theme}&codeLanguage={codeLanguage}&keyword={keyword}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
-    async def getMyWorks(self, page : int = 1, getNum : int = 20, theme : str = 'all', codeLanguage : str = 'all', status : int = 2, keyword : Union[str, any] = '') -> list:
-        '''
-        Get user works.
-
-        Parameters
-        ----------
-        `page` : int, default 1
-            Page number.
-        `getNum` : int, default 20
-            Number of works per page.
-        `theme` : str, default 'all'
-            Work theme in icodeshequ.
-
-            'all': All themes
-
-            'play': Games theme
-
-            'story': Story theme
-
-            'art': Art theme
-
-            'minecraft': Minecraft theme, the works about Minecraft
-
-            'scratch': Scratch works
-
-            'turtle': Python works
-        `codeLanguage` : str, default 'all'
-            The code language of works.
-
-            'all': All code language
-
-            'blockly': Blockly works
-
-            'scratch': Scratch works
-
-            'python': Python works
-        `status` : int, default 2
-            The publishing status of works
-
-            1: No published
-
-            2: Published
-        `keyword` : str, default ''
-            The key word of works.
-        ----------
-
-        This function will return a list, and the list always be like:
-        ```python
-        [
-            {
-                'id': str, 
-                'title': str, 
-                'imgUrl': str, 
-                'status': int,
-                'likeNum': int, 
-                'browseNum': int, 
-                'enshrineNum': int, 
-                'forkNum': int, 
-                'userName': str, 
-                'userImage': str, 
-                'codeLanguage': str, 
-                'theme': str, 
-                'subTheme': str
-            }
-        ]
-        ```
-        '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/works/list?page={page}&size={getNum}&status={status}&theme={theme}&codeLanguage={codeLanguage}&keyword={keyword}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
-    async def getWorkSubmitInfo(self, workId : str) -> dict:
-        '''
-        Get work submit info.
-
-        This function will return a dict, and the dict always be like:
-        ```python
-        {
-            'avatar': str, 
-            'category': str, 
-            'codeType': str, 
-            'commit': str, 
-            'createtime': str, 
-            'description': str, 
-            'fork': int, 
-            'forkcommit': str, 
-            'forkfrom': str, 
-            'likes': int, 
-            'owner': str, 
-            'publish': int, 
-            'qrCodeImage': str, 
-            'shareMessage': str, 
-            'shareText': str, 
-            'shareTitle': str, 
-            'subtheme': str, 
-            'theme': str, 
-            'thumbnail': str, 
-            'thumbnailList': list, 
-            'title': str, 
-            'username': str, 
-            'visits': int, 
-            'workid': str
-        }
-        ```
-
-        When the work is a python work, the dict will be:
-        ```python
-        {
-            'avatar': str, 
-            'category': str, 
-            'codeType': str, 
-            'code': str,
-            'commit': str, 
-            'createtime': str, 
-            'description': str, 
-            'fork': int, 
-            'forkcommit': str, 
-            'forkfrom': str, 
-            'likes': int, 
-            'owner': str, 
-            'publish': int, 
-            'qrCodeImage': str, 
-            'shareMessage': str, 
-            'shareText': str, 
-            'shareTitle': str, 
-            'subtheme': str, 
-            'theme': str, 
-            'thumbnail': 'str, 
-            'thumbnailList': list, 
-            'title': str, 
-            'username': str, 
-            'visits': int, 
-            'workid': str
-        }
-        ```
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icode.youdao.com/api/work/get?id={workId}', headers = headers)
-        result = response.json()
-        return result
-    
-    async def getPersonInfo(self, userId : str) -> dict:
-        '''
-        Get user info.
-
-        The function will return a dict, and the dict always be like:
-        ```python
-        {
-            'worksNum': int, 
-            'viewNum': int, 
-            'praiseNum': int, 
-            'enshrinesNum': int, 
-            'forkNum': int, 
-            'userId': str, 
-            'img': str, 
-            'nickName': str, 
-            'intro': str
-        }
-        ```
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/index/hisStatics?userId={userId}', headers = headers)
-        result = response.json().get('data')
-        return result
-
-    async def getPersonWorks(self, userId : str, page : int = 1, getNum : int = 20) -> list:
-        '''
-        Get user works.
-
-        This function will return a list, and the list always be like:
-        ```
-        [
-            {
-                'id': str, 
-                'title': str, 
-                'imgUrl': str, 
-                'status': int, 
-                'likeNum': int, 
-                'browseNum': int, 
-                'enshrineNum': int, 
-                'forkNum': int, 
-                'userName': str, 
-                'userImage': str, 
-                'codeLanguage': str, 
-                'theme': str, 
-                'subTheme': str
-            }
-        ]
-        ```
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/works/hisWorksList?page={page}&size={getNum}&userId={userId}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-
-    async def getPersonEnshrines(self, userId : str, page : int = 1, getNum : int = 20) -> list:
-        '''
-        Get user enshrines.
-
-        This function will return a list, and the list always be like:
-        ```python
-        [
-            {
-                'id': str, 
-                'title': str, 
-                'imgUrl': str, 
-                'userId': str, 
-                'status': int, 
-                'likeNum': int, 
-                'browseNum': int, 
-                'userName': str, 
-                'userImage': str, 
-                'codeLanguage': str, 
-                'theme': str, 
-                'subTheme': str
-            }
-        ]
-        ```
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/works/hisEnshrines?page={page}&size={getNum}&userId={userId}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
-    async def getReplies(self, commentId : int, page : int = 1, getNum : int = 20) -> list:
-        '''
-        Get the replies of a comment.
-
-        This function will return a list, and the list always be like:
-        ```python
-        [  # When this reply is a reply to a comment
-            {
-                "id": int,
-                "content": str,
-                "type": int,
-                "commentId": int,
-                "userId": str,
-                "name": str,
-                "image": str,
-                "isAuthor": bool,
-                "time": int,
-                "praiseNum": int,
-                "hasPraised": bool
-            }
-        ]
-        [ # When this reply is a reply to an another reply
-            {
-                "id": int,
-                "content": str,
-                "type": int,
-                "commentId": str,
-                "userId": str,
-                "name": str,
-                "image": str,
-                "isAuthor": bool,
-                "replyUserId": str,
-                "replyName": str,
-                "replyImage": str,
-                "time": int,
-                "praiseNum": int,
-                "hasPraised": bool
-            }
-        ]
-        ```
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://icodeshequ.youdao.com/api/works/reply/list?commentId={commentId}&page={page}&size={getNum}', headers = headers)
-        result = response.json().get('dataList')
-        return result
-    
-    async def getMessages(self, messageType : str = 'reply', page : int = 1, getNum : int = 20) -> list:
-        '''
-        Get the reply messages in messgaes hub.
-
-        Parameters
-        ----------
-        `messageType` : str, default "reply"
-            The type of messages in messages hub.
-
-            "reply": reply message
-
-            "enshrine": like and enshrine message
-
-            "system": system message
-        `page` : int, default 1
-            Page number.
-        `getNum` : int, default 20
-            Number of works per page.
-        ----------
-
-        This function will return a list, and the list always be like:
-        ```python
-        [
-            {
-                'actionUserId': str,
-                'actionUserImage': str,
-                'actionUserName': str,
-                'createTime': str,
-                'createTimeStr': str,
-                'haveRead': bool,
-                'id': int,
-                'type': int,
-                'worksId': str,
-                'worksTitle': str
-            }
-        ]
-        ```
-        '''
-        headers = {
-            'Cookie': self.__cookie,
-            'User-Agent': self.userAgent}
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        match messageType:
-            case 'reply':
-                response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/message/commentMessage?page={page}&size={getNum}', headers = headers)
-            case 'enshrine':
-                response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/message/enshrinesMessage?page={page}&size={getNum}', headers = headers)
-            case 'system':
-                response = await self.client.get(f'https://icodeshequ.youdao.com/api/user/message/systemMessage?page={page}&size={getNum}', headers = headers)
-            case _:
-                raise ValueError(f'messageType must be "reply" or "enshrine" or "system", not {messageType}')
-        result = response.json().get('dataList')
-        return result
-
-    async def getScratchAsset(self, md5ext : str):
-        '''
-        Get asset in scratch work.
-        '''
-        headers = {'User-Agent' : self.userAgent, 'Cookie' : self.__cookie}
-        response = await self.client.get(f'https://ydschool-online.nosdn.127.net/svg/{md5ext}', headers = headers)
-        result = response.content
-        return result
-    
-    async def comment(self, workId : str, content : str) -> dict:
-        '''
-        Comment a work.
+    def gatherPersonInfos(self, userIds, concurrency : int = 10, limiter : asyncio.Semaphore = None):
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        body = {
-            'id': workId,
-            'content': content
-        }
-        headers = {
-            'Content-Type': 'application/json',
-            'Cookie': self.__cookie,
-            'User-Agent': self.userAgent}
-        response = await self.client.post('https://icodeshequ.youdao.com/api/works/comment', json = body, headers = headers)
-        result = response.json()
-        return result
-    
-    async def like(self, workId : str, mode : int = 1) -> dict:
+        `getPersonInfo` for many users, see `gatherMany`.
         '''
-        Like a work.
+        return self.gatherMany(self.getPersonInfo, userIds, concurrency, limiter)
 
-        If mode = 1, like the work. If mode = 2, un-like the work.
+    def gatherComments(self, workIds, page : int = 1, getNum : int = 20, concurrency : int = 10, limiter : asyncio.Semaphore = None):
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        url = f'https://icodeshequ.youdao.com/api/works/like?id={workId}&type={mode}'
-        response = await self.client.post(url, data = 'IcodeAPI: Like request'.encode('utf-8'), headers = headers)
-        result = response.json()
-        return result
-    
-    async def enshrine(self, workId : str, mode : int = 1) -> dict:
+        `getWorkComments` for many works, see `gatherMany`.
         '''
-        Enshrine a work.
+        return self.gatherMany(self.getWorkComments, workIds, concurrency, limiter, page = page, getNum = getNum)
 
-        If mode = 1, enshrine the work. If mode = 2, un-enshrine the work.
+    def gatherReplies(self, commentIds, page : int = 1, getNum : int = 20, concurrency : int = 10, limiter : asyncio.Semaphore = None):
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        urlContent = 'enshrine' if (not (mode - 1)) else 'cancelEnshrine'
-        url = f'https://icodeshequ.youdao.com/api/user/works/{urlContent}?worksId={workId}'
-        response = await self.client.post(url, data = 'IcodeAPI: Enshrine request'.encode('utf-8'), headers = headers)
-        result = response.json()
-        return result
-    
-    async def report(self, workId : str, reason : str, reportType : int) -> dict:
+        `getReplies` for many comments, see `gatherMany`.
         '''
-        Report a work.
+        return self.gatherMany(self.getReplies, commentIds, concurrency, limiter, page = page, getNum = getNum)
 
-        reportType:
-            1: plagiarize,
-            2: ad spam,
-            3: personal attacks,
-            4: illegal,
-            5: r18 / r18g
-        '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        body = {'worksIdStr':workId,
-                'category':reportType,
-                'description':reason
-                }
-        response = await self.client.post('https://icodeshequ.youdao.com/api/works/report', json = body, headers = headers)
-        result = response.json()
-        return result
-    
-    async def submitWork(self, workCode : str = '', 
-                   workType : str = 'Scratch', 
-                   publish : int = 1,
-                   save : int = False,
-                   title : str = 'Scratch Project', 
-                   description : str = 'Project Description', 
-                   thumbnail : str = 'http://ydschool-online.nosdn.127.net/svg/0c3a986d5266bd5a186014aebd219e05c9696de777dea2b5dfe658dc661e572c.png',
-                   fork : int = 0,
-                   workDetail : tuple = None,
-                   workId : str = None) -> dict:
+    async def fanOutPages(self, fetch, getNum : int = 20, total : int = None, concurrency : int = 8, maxItems : int = None) -> list:
         '''
-        Submit a work.
-
-        This function only supported to submit Scratch or Python work, no Blockly.
-
-        If the workId isnt None, the function will reSubmit the work.
-
-        When the workType is Python, and the save is true, the funciton will only save the work, not publish the work.
-
-        If publish = 1, the function will publish the work, when it is 2, the fucntion will unpublish the work.
+        Fetch the pages of `fetch(page)` concurrently and return all items in page order.
 
-        If fork = 1, allow others to fork your work, if fork = 0, dont allow others to fork your work.
+        The first page is read first. If `total`, the total count of items, is known,
+        the other pages are fetched at the same time, at most `concurrency` pages at once.
+        Otherwise, or if the last known page is still full, pages are fetched in waves of `concurrency` pages until a short page.
 
-        If workDetail should be a tuple. workDetail[0] = `getWorkDetail()` return value, workDetail[1] = `getWorkSubmitInfo()` return value.
+        The first exception raised by a page is raised again.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        if workDetail:
-            if not workId:
-                match workDetail[0].get('codeLanguage'):
-                    case 'scratch':
-                        fields = {
-                            'category' : 'lab',
-                            'code' : workDetail[0].get('code'),
-                            'codeType' : 'json',
-                            'theme' : 'scratch',
-                            'subtheme' : 'scratch',
-                            'description' : workDetail[0].get('description'),
-                            'fork' : workDetail[1].get('fork'),
-                            'publish' : workDetail[0].get('status') % 2 + 1,
-                            'thumbnail' : workDetail[0].get('imgUrl'),
-                            'title' : workDetail[0].get('title')
-                        }
-                        fields=urllib3.encode_multipart_formdata(fields=fields)
-                        body = fields[0]
-                        headers = headers
-                        headers['Content-Type'] = fields[1]
-                        response = await self.client.post('https://icode.youdao.com/api/work/submit',data = body, headers = headers)
-                    case 'python':
-                        if save:
-                            body = {
-                                'code' : workDetail[0].get('code'),
-                                'description' : workDetail[0].get('description'),
-                                'title': workDetail[0].get('title')
-                            }
-                            headers = headers
-                            headers['Content-Type'] = 'application/json'
-                            response = await self.client.post('https://icodeshequ.youdao.com/api/works/save', json = body, headers = headers)
-                        else:
-                            body = {
-                                'code' : workDetail[0].get('code'),
-                                'description' : workDetail[0].get('description'),
-                                'title': workDetail[0].get('title'),
-                                'imgUrl': workDetail[0].get('imgUrl')
-                            }
-                            headers = headers
-                            headers['Content-Type'] = 'application/json'
-                            response = await self.client.post(f'https://icodeshequ.youdao.com/api/works/publish?publishType={workDetail[0].get("status") % 2 + 1}', json = body, headers = headers)
-                    case _:
-                        raise ValueError('Invalid workDetail.')
-            else:
-                match workDetail[0].get('codeLanguage'):
-                    case 'scratch':
-                        fields = {
-                            'category' : 'lab',
-                            'code' : workDetail[0].get('code'),
-                            'codeType' : 'json',
-                            'theme' : 'scratch',
-                            'subtheme' : 'scratch',
-                            'description' : workDetail[0].get('description'),
-                            'fork' : workDetail[1].get('fork'),
-                            'publish' : workDetail[0].get('status') % 2 + 1,
-                            'thumbnail' : workDetail[0].get('imgUrl'),
-                            'title' : workDetail[0].get('title'),
-                            'workid' : workId
-                        }
-                        fields=urllib3.encode_multipart_formdata(fields=fields)
-                        body = fields[0]
-                        headers = headers
-                        headers['Content-Type'] = fields[1]
-                        response = await self.client.post('https://icode.youdao.com/api/work/submit',data = body, headers = headers)
-                    case 'python':
-                        if save:
-                            body = {
-                                'code' : workDetail[0].get('code'),
-                                'description' : workDetail[0].get('description'),
-                                'title': workDetail[0].get('title'),
-                                'id' : workId
-                            }
-                            headers = headers
-                            headers['Content-Type'] = 'application/json'
-                            response = await self.client.post('https://icodeshequ.youdao.com/api/works/save', json = body, headers = headers)
-                        else:
-                            body = {
-                                'code' : workDetail[0].get('code'),
-                                'description' : workDetail[0].get('description'),
-                                'title': workDetail[0].get('title'),
-                                'imgUrl': workDetail[0].get('imgUrl'),
-                                'id' : await workId
-                            }
-                            headers = headers
-                            headers['Content-Type'] = 'application/json'
-                            response = await self.client.post(f'https://icodeshequ.youdao.com/api/works/publish?publishType={workDetail[0].get("status") % 2 + 1}', json = body, headers = headers)
-                    case _:
-                        raise ValueError('Invalid workDetail.')
-            result = response.json()
-            return result
-        if not workId:
-            if workType in ['Scratch', 'scratch']:
-                fields = [("category", (None, 'lab')), ("code", (None, workCode)), ("codeType", (None, 'json')), ("theme", (None, 'scratch')),("subtheme", (None, 'scratch')),("description", (None, description)),("fork", (None, fork)),("publish", (None,publish)),("thumbnail", (None, thumbnail)),("title", (None, title))]
-                fields=urllib3.encode_multipart_formdata(fields=fields)
-                body = fields[0]
-                headers['Content-Type'] = fields[1]
-                response = await self.client.post('https://icode.youdao.com/api/work/submit', data = body, headers = headers)
-            else:
-                if workType in ['Python', 'python']:
-                    if save:
-                        body = {
-                            'code' : workCode,
-                            'description' : description,
-                            'title': title
-                        }
-                        headers['Content-Type'] = 'application/json'
-                        response = await self.client.post('https://icodeshequ.youdao.com/api/works/save', json = body, headers = headers)
-                    else:
-                        body = {
-                            'code': workCode,
-                            'description': description,
-                            'title': title,
-                            'imgUrl': thumbnail
-                        }
-                        headers['Content-Type'] = 'application/json'
-                        response = await self.client.post(f'https://icodeshequ.youdao.com/api/works/publish?publishType={publish}', json = body, headers = headers)
-                else:
-                    raise ValueError(f'The workType must be "Scratch" or "Python", not {workType}')
-        else:
-            if workType in ['Scratch', 'scratch']:
-                fields = [("category", (None, 'lab')), ("code", (None, workCode)), ("codeType", (None, 'json')), ("theme", (None, 'scratch')),("subtheme", (None, 'scratch')),("description", (None, description)),("fork", (None, fork)),("publish", (None,publish)),("thumbnail", (None, thumbnail)),("title", (None, title)),('workid',(None,workId))]
-                fields=urllib3.encode_multipart_formdata(fields=fields)
-                body = fields[0]
-                headers['Content-Type'] = fields[1]
-                response = await self.client.post('https://icode.youdao.com/api/work/submit', data = body, headers = headers)
-            elif workType in ['Python', 'python']:
-                if save:
-                    body = {
-                        'code' : workCode,
-                        'description' : description,
-                        'title': title,
-                        'id': workId
-                    }
-                    headers['Content-Type'] = 'application/json'
-                    response = await self.client.post('https://icodeshequ.youdao.com/api/works/save', json = body, headers = headers)
-                else:
-                    body = {
-                        'code': workCode,
-                        'description': description,
-                        'title': title,
-                        'imgUrl': thumbnail,
-                        'id': workId
-                    }
-                    headers['Content-Type'] = 'application/json'
-                    response = await self.client.post(f'https://icodeshequ.youdao.com/api/works/publish?publishType={publish}', data = body, headers = headers)
+        first = await fetch(1) or []
+        pages = {1: first}
+        maxPages = None if maxItems is None else -(-maxItems // getNum)
+        lastPage = None if total is None else -(-total // getNum)
+        start = 2
+        while len(pages[start - 1]) >= getNum and (maxPages is None or start <= maxPages):
+            if lastPage is not None and lastPage >= start:
+                end = lastPage + 1
             else:
-                raise ValueError(f'The workType must be "Scratch" or "Python", not {workType}')
+                end = start + concurrency
+            if maxPages is not None:
+                end = min(end, maxPages + 1)
+            async with contextlib.aclosing(self.gatherMany(fetch, range(start, end), concurrency)) as results:
+                async for i in results:
+                    if not i.ok:
+                        raise i.error
+                    pages[i.item] = i.result or []
+            if any(len(pages[page]) < getNum for page in range(start, end)):
+                break
+            start = end
+        result = []
+        for page in sorted(pages):
+            result += pages[page]
+            if len(pages[page]) < getNum:
+                break
+        return result if maxItems is None else result[:maxItems]
 
-        result = response.json()
-        return result
-    
-    async def deleteWork(self, workId : str) -> dict:
-        '''
-        Delete a work.
+    def fanOutWorks(self, getNum : int = 20, sortType : int = 2, theme : str = 'all', codeLanguage : str = 'all', keyword : Union[str, any] = '', concurrency : int = 8, maxItems : int = None):
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie' : self.__cookie, 'User-Agent' : self.userAgent}
-        response = await self.client.delete(f'https://icodeshequ.youdao.com/api/works/delete?id={workId}', headers = headers)
-        reslut = response.json()
-        return reslut
-    
-    async def updateIntro(self, intro : str = 'IcodeAPI: The Best API Framework for icodeshequ.youdao.com in Python. Document url: https://xbz-studio.gitbook.io/icodeapi'):
-        '''
-        Update user intro.
-        '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie' : self.__cookie, 'User-Agent' : self.userAgent}
-        response = await self.client.post('https://icodeshequ.youdao.com/api/user/updateIntro', data = intro.encode('utf-8'), headers = headers)
-        result = response.json()
-        return result
-    
-    async def reply(self, content : str, commentId : int, replyId : int = None) -> dict:
+        Get all works with `getWorks` in concurrent pages, see `fanOutPages`.
         '''
-        Reply a comment.
-
-        You can reply a comment or an another reply.
+        return self.fanOutPages(lambda page: self.getWorks(page, getNum, sortType, theme, codeLanguage, keyword), getNum, None, concurrency, maxItems)
 
-        If you want to reply an another reply, you should 
-        '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        body = {'commentId': commentId,
-                'content': content,
-                'replyId': replyId}
-        headers = {'Cookie' : self.__cookie, 'User-Agent' : self.userAgent}
-        headers['Content-Type'] = 'application/json'
-        response = await self.client.post('https://icodeshequ.youdao.com/api/works/reply', json = body, headers = headers)
-        result = response.json()
-        return result
-    
-    async def deleteComment(self, commentId : int = None, replyId : int = None) -> dict:
-        '''
-        Delete a comment.
-        '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie' : self.__cookie, 'User-Agent' : self.userAgent}
-        if commentId:
-            response = await self.client.post(f'https://icodeshequ.youdao.com/api/works/comment/delete?commentId={commentId}', data = 'IcodeAPI delete comment'.encode('utf-8'), headers = headers)
-        elif replyId:
-            response = await self.client.post(f'https://icodeshequ.youdao.com/api/works/reply/delete?replyId={replyId}', data = 'IcodeAPI delete reply'.encode('utf-8'), headers = headers)
-        else:
-            raise ValueError(f'Both commentId and replyId is None')
-        result = response.json()
-        return result
-    
-    async def deleteMessage(self, messageId : int) -> dict:
-        '''
-        Delete a message in message hub.
-        '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie' : self.__cookie, 'User-Agent' : self.userAgent}
-        body = {
-            'id': messageId
-        }
-        headers['Content-Type'] = 'application/json'
-        response = await self.client.post('https://icodeshequ.youdao.com/api/user/message/deleteComment', json = body, headers = headers)
-        result = response.json()
-        return result
-    
-    async def uploadFile(self, name : str, suffix : str, file : Union[bytes, str]) -> dict:
-        '''
-        Upload file to icodeshequ.youdao.com .
-        '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        response = await self.client.post(f'https://tiku-outside.youdao.com/nos/scratch/asset/{name}.{suffix}/', data = file)
-        result = response.json()
-        return result
-    
-    async def praiseComment(self, commentId : int = None, replyId : int = None, mode : int = 1) -> dict:
-        '''
-        Praise a comment or reply.
+    async def fanOutPersonWorks(self, userId : str, getNum : int = 20, concurrency : int = 8, maxItems : int = None) -> list:
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        match mode:
-            case 1:
-                url = 'https://icodeshequ.youdao.com/api/works/comment/praise?'
-            case 2:
-                url = 'https://icodeshequ.youdao.com/api/works/comment/cancelPraise?'
-            case _:
-                raise ValueError(f'The mode must be 1 or 2, not {mode}')
-        if commentId:
-            url += f'commentId={commentId}'
-        elif replyId:
-            url = url.replace('comment', 'reply')
-            url += f'replyId={replyId}'
-        else:
-            raise ValueError(f'Both commentId and replyId is None')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        response = await self.client.post(url, data = 'IcodeAPI: praiseComment'.encode('utf-8'), headers = headers)
-        result = response.json()
-        return result
-    
-    async def readMessage(self, messageId : int) -> dict:
+        Get all works of a user in concurrent pages, the page count comes from `getPersonInfo`, see `fanOutPages`.
         '''
-        Read a message in messages hub.
+        info = await self.getPersonInfo(userId) or {}
+        return await self.fanOutPages(lambda page: self.getPersonWorks(userId, page, getNum), getNum, info.get('worksNum'), concurrency, maxItems)
 
-        After reading, the message will not show a red point again.
-        '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        response = await self.client.put(f'https://icodeshequ.youdao.com/api/user/message/read?id={messageId}', headers  = headers)
-        result = response.json()
-        return result
-    
-    async def readAllMessages(self, tab : int = 1) -> dict:
+    async def fanOutPersonEnshrines(self, userId : str, getNum : int = 20, concurrency : int = 8, maxItems : int = None) -> list:
         '''
-        Read all messages in messages hub.
-
-        After reading, all messages will not show a red point again.
-
-        tab = 1:
-            Read all comment messages.
-        tab = 2:
-            Read all enshrine messages.
-        tab = 3:
-            Read all system messages.
+        Get all enshrines of a user in concurrent pages, the page count comes from `getPersonInfo`, see `fanOutPages`.
         '''
-        if not self.__loginStatus:
-            raise LoginError('User is not logged in')
-        headers = {'Cookie': self.__cookie, 'User-Agent': self.userAgent}
-        headers['Content-Type'] = 'application/json'
-        body = {
-            "tab" : tab
-        }
-        response = await self.client.post('https://icodeshequ.youdao.com/api/user/message/readAll', json = body, headers = headers)
-        result = response.json()
-        return result
+        info = await self.getPersonInfo(userId) or {}
+        return await self.fanOutPages(lambda page: self.getPersonEnshrines(userId, page, getNum), getNum, info.get('enshrinesNum'), concurrency, maxItems)
 
-    
     async def closeClient(self):
         '''
         Close the client.
@@ -1956,6 +1735,7 @@ class AsyncIcodeAPI(IcodeAPI):
     def __del__(self):
         pass
 
+
 def getWorkIdFromUrl(url : str) -> str:
     '''
     Get work id from url.
@@ -2041,4 +1821,31 @@ beta阶段结束
         添加IcodeAPI和AsyncIcodeAPI中login方法的newCookie参数,使一个账号对象可以进行重登录
         添加常量DEFAULT_USER_AGENT,
         优化注释
+    v1.1.0
+        IcodeAPI和AsyncIcodeAPI不再共用默认参数中的httpx客户端,每个对象默认拥有自己的连接池,增加buildClient函数和maxConnections, maxKeepalive, keepaliveExpiry, http2, hostLimits参数,增加IcodeAPI的closeClient方法,
+        增加AsyncIcodeAPI的gatherMany, gatherDetails, gatherPersonInfos, gatherComments, gatherReplies方法和BatchResult类,用于限制并发数的批量请求,tools模块的ViewNumMaker和CommentsCleaner改用gatherMany,
+        增加iterWorks, iterMyWorks, iterPersonWorks, iterPersonEnshrines, iterComments, iterReplies, iterMessages方法,逐页迭代并预取下一页,tools模块的CommentsCleaner不再一次请求INFINITY条评论,
+        增加AsyncIcodeAPI的fanOutPages, fanOutWorks, fanOutPersonWorks, fanOutPersonEnshrines方法,并发获取多页并按页码顺序拼接,
+        增加cache模块和ResponseCache类,IcodeAPI和AsyncIcodeAPI增加cache参数,缓存getPersonInfo, getWorkDetail(addBrowseNum = False), getWorkSubmitInfo, getMoreWorks的结果,comment, like, submitWork, deleteWork等写操作后会自动清除相关缓存,
+        AsyncIcodeAPI增加coalesce参数,同时发出的相同GET请求(相同url和cookie)会共用一个响应,
+        增加assets模块和AssetStore类,按md5ext在本地磁盘缓存scratch作品资源,支持大小上限, LRU淘汰, md5校验和mmap读取,getScratchAsset和tools模块的DownloadWork会优先读取它,
+        tools模块的DownloadWork按md5ext去重并发下载scratch资源,增加concurrency和progress参数,
+        tools模块的DownloadWork不再使用临时文件夹和os.chdir,直接把project.json和资源一次写入.sb3,已压缩的资源(png, mp3, wav等)不再重复压缩,path参数现在可以是文件夹,类文件对象或None(返回bytes),
+        tools模块增加ArchiveWorks方法,把一些用户或一次getWorks搜索的所有作品并发备份到本地,跳过updateTimeStr没有变化的作品,并写入可续传的manifest,
+        新增transport模块,所有api改为由一张声明式的接口表和统一的请求引擎实现,AsyncIcodeAPI只保留异步的请求引擎,不再复制每个api,
+        修复IcodeAPI的getReplies使用不存在的self.headers, AsyncIcodeAPI的uploadFile没有发送cookie, AsyncIcodeAPI重新提交python作品时报错的bug,getScratchAsset在请求失败时会抛出httpx.HTTPStatusError,
+        登录身份(cookie, userAgent, 用户信息)改为不可变的Identity对象,增加getIdentity方法,自有连接池的公共请求头只在客户端上设置一次,
+        增加codec模块,响应JSON的解析自动使用已安装的最快后端(orjson, msgspec, json),可用jsonDecoder参数指定,getWorkDetail和gatherDetails增加fields参数,安装msgspec时只解析需要的字段,
+        增加records模块,读取类API可以返回带__slots__的记录类型(Work, WorkDetail, Comment, Reply, Message, PersonInfo)或msgspec结构体,由records参数按实例或按调用选择,记录可以像dict一样读取,
+        增加columns模块和ColumnCollector类,把作品等列表结果按id去重后直接收集为列,可以导出为pyarrow表, Parquet文件或numpy记录数组,
+        增加streamScratchAsset和streamWorkDetail方法,把响应分块写入文件或回调函数,AssetStore增加writer方法分块写入资源,tools模块的DownloadWork和ArchiveWorks改为流式下载,资源超过1MB时暂存到临时文件,
+        增加ratelimit模块,RateLimiter按域名使用令牌桶限流(可在进程内共享,遇到429/503自动降速),RetryPolicy在429, 5xx和连接错误时带随机退避重试GET请求并遵守Retry-After,IcodeAPI和AsyncIcodeAPI增加rateLimiter和retry参数,
+        增加metrics模块,Metrics按接口统计请求次数,状态码,延迟直方图,等待连接池的时间,收发字节数,重试和缓存命中,snapshot方法返回统计结果,exporters可以对接Prometheus或OpenTelemetry,IcodeAPI和AsyncIcodeAPI增加metrics参数,
+        增加hooks模块和Event类,IcodeAPI和AsyncIcodeAPI增加hooks参数和addHook, removeHook方法,每次请求前后和出错时调用钩子,钩子可以得到接口名称,作品或用户ID等参数,耗时和响应大小,
+        增加benchmarks包,本地模拟icodeshequ服务器(uvicorn或标准库线程服务器,可设置延迟)返回真实的响应结构,python -m icodeapi.benchmarks运行同步/异步,翻页,DownloadWork,批量删除等场景,输出每秒请求数, p50/p99延迟和峰值内存,
+        增加lazyLogin参数,可以推迟登录到第一次需要登录的请求或ensureLogin方法,AsyncIcodeAPI默认推迟登录且并发请求只登录一次,增加session模块和SessionFile类,session参数可以把登录结果和cookie保存到本地文件,有效期内重启不再发送登录请求,
+        导入icodeapi和icodeapi.tools时不再加载urllib3, aiofiles和zipfile,只在submitWork和DownloadWork需要时加载,增加python -m icodeapi.benchmarks --imports测量导入耗时,
+        增加multipart模块和MultipartEncoder类,submitWork提交Scratch作品时分块编码并流式发送表单,不再生成完整的请求体,也不再需要urllib3,
+        增加hasScratchAsset方法,用HEAD请求检查资源是否已在资源服务器上,tools模块增加UploadWork,读取本地.sb3文件,在线程池中计算资源的md5,只上传资源服务器上没有的资源(并发上传)后提交作品,
+        tools模块增加ScratchManifest,只扫描md5ext字段得到Scratch作品的资源列表,不解析整个作品,DownloadWork和ArchiveWorks增加executor参数,作品详情的解码和资源列表的提取在线程池或进程池中进行,不再阻塞事件循环,
 '''
\ No newline at end of file
@@ -0,0 +1,207 @@
+'''
+icodeapi asset store.
+
+A local, content-addressed store of Scratch assets.
+'''
+
+import os, mmap, hashlib, threading, tempfile, contextlib
+from collections import OrderedDict
+
+class AssetStore():
+    '''
+    A disk store of Scratch assets, keyed by md5ext like `'0c3a986d5266bd5a186014aebd219e05.png'`.
+
+    A md5ext is the md5 of the asset, so a stored asset never changes.
+
+    When the store is bigger than `maxSize` bytes, the least recently used assets are removed.
+    If `verify` is True, the md5 of an asset is checked when it is read, a broken asset is removed.
+    If `useMmap` is True, `get` reads assets by memory mapping, `open` always does.
+    '''
+    def __init__(self, path : str, maxSize : int = 1024 ** 3, verify : bool = False, useMmap : bool = False):
+        self.path = os.path.abspath(path)
+        self.maxSize = maxSize
+        self.verify = verify
+        self.useMmap = useMmap
+        self.__entries = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+        os.makedirs(self.path, exist_ok = True)
+        found = []
+        for dirpath, dirnames, filenames in os.walk(self.path):
+            for name in filenames:
+                if name.endswith('.tmp'):
+                    continue
+                stat = os.stat(os.path.join(dirpath, name))
+                found.append((stat.st_mtime, name, stat.st_size))
+        for mtime, name, size in sorted(found):
+            self.__entries[name] = size
+            self.__size += size
+
+    def _filePath(self, md5ext : str) -> str:
+        if not md5ext or '/' in md5ext or '\\' in md5ext or md5ext.startswith('.'):
+            raise ValueError(f'Invalid md5ext: {md5ext!r}')
+        return os.path.join(self.path, md5ext[:2], md5ext)
+
+    @staticmethod
+    def checkHash(md5ext : str, data) -> bool:
+        '''
+        Check that the md5 of `data` matches `md5ext`.
+        '''
+        return hashlib.md5(data).hexdigest() == md5ext.split('.')[0].lower()
+
+    def _touch(self, md5ext : str, path : str):
+        with self.__lock:
+            if md5ext in self.__entries:
+                self.__entries.move_to_end(md5ext)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def has(self, md5ext : str) -> bool:
+        return md5ext in self.__entries
+
+    def __contains__(self, md5ext : str) -> bool:
+        return self.has(md5ext)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def size(self) -> int:
+        '''
+        The size of all stored assets in bytes.
+        '''
+        return self.__size
+
+    def get(self, md5ext : str) -> bytes:
+        '''
+        Get an asset, return None if it is not stored.
+        '''
+        if md5ext not in self.__entries:
+            return None
+        path = self._filePath(md5ext)
+        try:
+            if self.useMmap:
+                with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+                    data = mm[:]
+            else:
+                with open(path, 'rb') as f:
+                    data = f.read()
+        except (OSError, ValueError):
+            self.discard(md5ext)
+            return None
+        if self.verify and not self.checkHash(md5ext, data):
+            self.discard(md5ext)
+            return None
+        self._touch(md5ext, path)
+        return data
+
+    def open(self, md5ext : str) -> mmap.mmap:
+        '''
+        Memory map an asset for reading, return None if it is not stored or empty.
+
+        Close the returned mmap after use, or use it in a `with` statement.
+        '''
+        if md5ext not in self.__entries:
+            return None
+        path = self._filePath(md5ext)
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if self.verify and not self.checkHash(md5ext, mm):
+            mm.close()
+            self.discard(md5ext)
+            return None
+        self._touch(md5ext, path)
+        return mm
+
+    def put(self, md5ext : str, data : bytes) -> bool:
+        '''
+        Store an asset.
+
+        If `verify` is True and the md5 of `data` doesn't match, the asset is not stored and False is returned.
+        '''
+        if self.verify and not self.checkHash(md5ext, data):
+            return False
+        path = self._filePath(md5ext)
+        if md5ext in self.__entries:
+            self._touch(md5ext, path)
+            return True
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        tmpPath = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmpPath, 'wb') as f:
+            f.write(data)
+        self._commit(md5ext, tmpPath, path, len(data))
+        return True
+
+    @contextlib.contextmanager
+    def writer(self, md5ext : str):
+        '''
+        Store an asset written in chunks, the asset is never held in memory as a whole.
+
+        ```python
+        with store.writer(md5ext) as write:
+            for chunk in chunks:
+                write(chunk)
+        ```
+
+        The asset is stored when the block ends without an exception.
+        If `verify` is True and the md5 of the written data doesn't match, the asset is not stored.
+        '''
+        path = self._filePath(md5ext)
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        fd, tmpPath = tempfile.mkstemp('.tmp', md5ext + '.', os.path.dirname(path))
+        md5 = hashlib.md5()
+        size = 0
+        try:
+            with open(fd, 'wb') as f:
+                def write(chunk):
+                    nonlocal size
+                    f.write(chunk)
+                    md5.update(chunk)
+                    size += len(chunk)
+                yield write
+        except BaseException:
+            os.remove(tmpPath)
+            raise
+        if self.verify and md5.hexdigest() != md5ext.split('.')[0].lower():
+            os.remove(tmpPath)
+            return
+        self._commit(md5ext, tmpPath, path, size)
+
+    def _commit(self, md5ext : str, tmpPath : str, path : str, size : int):
+        os.replace(tmpPath, path)
+        with self.__lock:
+            if md5ext not in self.__entries:
+                self.__entries[md5ext] = size
+                self.__size += size
+        self._evict()
+
+    def discard(self, md5ext : str):
+        '''
+        Remove an asset.
+        '''
+        with self.__lock:
+            size = self.__entries.pop(md5ext, None)
+            if size is None:
+                return
+            self.__size -= size
+        try:
+            os.remove(self._filePath(md5ext))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while True:
+            with self.__lock:
+                if self.__size <= self.maxSize or len(self.__entries) <= 1:
+                    return
+                md5ext, size = self.__entries.popitem(last = False)
+                self.__size -= size
+            try:
+                os.remove(self._filePath(md5ext))
+            except OSError:
+                pass
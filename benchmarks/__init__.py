@@ -0,0 +1,232 @@
+'''
+icodeapi benchmarks.
+
+Measure the overhead of icodeapi against a local mock of icodeshequ, no network needed.
+
+```
+python -m icodeapi.benchmarks --latency 0.01 --scale 200
+```
+
+Every scenario reports requests per second, p50 and p99 latency and the peak RSS of the process
+(on Windows only if psutil is installed).
+`--imports` measures the import time of icodeapi instead, see `benchmarks.imports`.
+'''
+
+import asyncio, time, sys, io, json, subprocess, itertools, hashlib
+from .. import IcodeAPI, AsyncIcodeAPI, Metrics
+
+try:
+    import resource
+except ImportError:
+    resource = None
+from .server import MockData, MockApp, MockServer
+from .transport import RewriteTransport, AsyncRewriteTransport
+
+class Result():
+    '''
+    The result of a scenario, latencies are in seconds and `peakRss` in bytes, 0 if it is unknown.
+    '''
+    __slots__ = ('name', 'requests', 'seconds', 'p50', 'p99', 'peakRss')
+
+    def __init__(self, name : str, requests : int, seconds : float, p50 : float, p99 : float, peakRss : int):
+        self.name = name
+        self.requests = requests
+        self.seconds = seconds
+        self.p50 = p50
+        self.p99 = p99
+        self.peakRss = peakRss
+
+    @classmethod
+    def fromLatencies(cls, name : str, seconds : float, latencies : list, peakRss : int) -> 'Result':
+        latencies = sorted(latencies)
+        def quantile(q):
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+        return cls(name, len(latencies), seconds, quantile(0.5), quantile(0.99), peakRss)
+
+    @property
+    def rps(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def toDict(self) -> dict:
+        '''
+        This function will return a dict, and the dict always be like:
+        ```python
+        {
+            'name': str,
+            'requests': int,
+            'seconds': float,
+            'rps': float,
+            'p50': float,  # seconds
+            'p99': float,  # seconds
+            'peakRss': int  # bytes
+        }
+        ```
+        '''
+        return {
+            'name' : self.name,
+            'requests' : self.requests,
+            'seconds' : self.seconds,
+            'rps' : self.rps,
+            'p50' : self.p50,
+            'p99' : self.p99,
+            'peakRss' : self.peakRss
+        }
+
+    def __str__(self):
+        return (f'{self.name:<16} {self.requests:>7} req {self.seconds:>8.3f} s {self.rps:>9.1f} req/s '
+                f'p50 {self.p50 * 1000:>8.2f} ms p99 {self.p99 * 1000:>8.2f} ms '
+                + (f'rss {self.peakRss / 1024 ** 2:>7.1f} MiB' if self.peakRss else 'rss     n/a'))
+
+def peakRss() -> int:
+    '''
+    The peak RSS of the process in bytes, from `resource`, or from psutil where there is no `resource` (Windows).
+    0 if neither is available.
+    '''
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+    try:
+        import psutil
+    except ImportError:
+        return 0
+    info = psutil.Process().memory_info()
+    return getattr(info, 'peak_wset', info.rss)
+
+def _syncApi(server : MockServer, metrics : Metrics, **kwargs) -> IcodeAPI:
+    return IcodeAPI('benchmarks=1', httpxClient = server.client(), metrics = metrics, **kwargs)
+
+def _asyncApi(server : MockServer, metrics : Metrics, **kwargs) -> AsyncIcodeAPI:
+    return AsyncIcodeAPI('benchmarks=1', httpxClient = server.asyncClient(), metrics = metrics, **kwargs)
+
+def _workIds(data : MockData, count : int, scratch : bool = False) -> list:
+    ids = (i for i in range(data.works) if not scratch or i % 5)
+    return [f'{i:032x}' for i in itertools.islice(itertools.cycle(ids), count)]
+
+def syncDetail(server, metrics, scale, concurrency):
+    api = _syncApi(server, metrics)
+    for workId in _workIds(server.app.data, scale):
+        api.getWorkDetail(workId)
+    api.closeClient()
+
+def syncPages(server, metrics, scale, concurrency):
+    api = _syncApi(server, metrics)
+    for i in api.iterWorks(maxItems = scale * 20):
+        pass
+    api.closeClient()
+
+async def asyncDetail(server, metrics, scale, concurrency):
+    api = _asyncApi(server, metrics)
+    await api.login()
+    async for i in api.gatherDetails(_workIds(server.app.data, scale), concurrency = concurrency):
+        pass
+    await api.closeClient()
+
+async def asyncPages(server, metrics, scale, concurrency):
+    api = _asyncApi(server, metrics)
+    await api.fanOutWorks(concurrency = concurrency, maxItems = scale * 20)
+    async for i in api.iterWorks(maxItems = scale * 20):
+        pass
+    await api.closeClient()
+
+async def downloadWork(server, metrics, scale, concurrency):
+    from ..tools import DownloadWork
+    api = _asyncApi(server, metrics)
+    for workId in _workIds(server.app.data, max(1, scale // 20), scratch = True):
+        await DownloadWork(workId, io.BytesIO(), api, concurrency = concurrency)
+    await api.closeClient()
+
+def _sb3(data : MockData, index : int) -> bytes:
+    '''
+    An .sb3 archive with the assets of `data`, every second asset is changed by `index`, so it isnt on the asset host yet.
+    '''
+    import zipfile
+    assets = {}
+    for i, (md5ext, asset) in enumerate(data.assetData.items()):
+        if i % 2:
+            asset = b'upload%08d%08d' % (index, i) + asset[22:]
+            md5ext = hashlib.md5(asset).hexdigest() + '.' + md5ext.rsplit('.', 1)[-1]
+        assets[md5ext] = asset
+    items = [{'name' : i, 'md5ext' : i, 'assetId' : i.split('.')[0], 'dataFormat' : i.split('.')[1]} for i in assets]
+    project = {
+        'targets' : [{'isStage' : True, 'name' : 'Stage', 'blocks' : {},
+                      'costumes' : [i for i in items if i['dataFormat'] == 'png'], 'sounds' : [i for i in items if i['dataFormat'] == 'wav']}],
+        'meta' : {'semver' : '3.0.0', 'vm' : '0.2.0', 'agent' : 'icodeapi benchmarks'}
+    }
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as zf:
+        zf.writestr('project.json', json.dumps(project))
+        for md5ext, asset in assets.items():
+            zf.writestr(md5ext, asset)
+    return out.getvalue()
+
+async def uploadWork(server, metrics, scale, concurrency):
+    from ..tools import UploadWork
+    api = _asyncApi(server, metrics)
+    await api.login()
+    for i in range(max(1, scale // 20)):
+        result = await UploadWork(_sb3(server.app.data, i), api, title = f'Upload {i}', concurrency = concurrency)
+        if result['result'].get('code'):
+            raise RuntimeError(f'The work is not submitted: {result["result"]}')
+    await api.closeClient()
+
+async def batchDelete(server, metrics, scale, concurrency):
+    from ..tools import CommentsCleaner
+    api = _asyncApi(server, metrics)
+    await api.login()
+    for workId in _workIds(server.app.data, max(1, scale // 20)):
+        await CommentsCleaner(workId, api, concurrency = concurrency)
+    await api.closeClient()
+
+SCENARIOS = {
+    'syncDetail' : syncDetail,
+    'syncPages' : syncPages,
+    'asyncDetail' : asyncDetail,
+    'asyncPages' : asyncPages,
+    'downloadWork' : downloadWork,
+    'uploadWork' : uploadWork,
+    'batchDelete' : batchDelete
+}
+
+def runScenario(name : str, server : MockServer, scale : int = 100, concurrency : int = 16) -> Result:
+    '''
+    Run a scenario in `SCENARIOS` against `server`.
+    '''
+    latencies = []
+    metrics = Metrics(exporters = [lambda sample: sample.cached or latencies.append(sample.latency)])
+    scenario = SCENARIOS[name]
+    start = time.perf_counter()
+    if asyncio.iscoroutinefunction(scenario):
+        asyncio.run(scenario(server, metrics, scale, concurrency))
+    else:
+        scenario(server, metrics, scale, concurrency)
+    seconds = time.perf_counter() - start
+    return Result.fromLatencies(name, seconds, latencies, peakRss())
+
+def run(names : list = None, latency : float = 0.0, scale : int = 100, concurrency : int = 16, backend : str = None,
+        isolate : bool = False, data : MockData = None, output = print) -> list:
+    '''
+    Run scenarios against a new mock server, return their `Result`s.
+
+    `latency` is the delay of every response in seconds, `scale` is the number of requests of a scenario (about).
+    If `isolate` is True, every scenario runs in a new process, so its peak RSS is its own.
+    '''
+    names = list(names or SCENARIOS)
+    results = []
+    if isolate:
+        for name in names:
+            process = subprocess.run([sys.executable, '-m', __name__, '--json', '--scenario', name, '--latency', str(latency),
+                                      '--scale', str(scale), '--concurrency', str(concurrency)] + (['--backend', backend] if backend else []),
+                                     capture_output = True, text = True, check = True)
+            item = json.loads(process.stdout.strip().splitlines()[-1])[0]
+            result = Result(name, item['requests'], item['seconds'], item['p50'], item['p99'], item['peakRss'])
+            results.append(result)
+            if output:
+                output(str(result))
+        return results
+    with MockServer(data, latency, backend) as server:
+        for name in names:
+            result = runScenario(name, server, scale, concurrency)
+            results.append(result)
+            if output:
+                output(str(result))
+    return results
@@ -0,0 +1,31 @@
+'''
+Run the icodeapi benchmarks, see `python -m icodeapi.benchmarks --help`.
+'''
+
+import argparse, json
+from . import SCENARIOS, run
+from .imports import runImports
+
+def main(argv : list = None):
+    parser = argparse.ArgumentParser(prog = 'python -m icodeapi.benchmarks', description = 'Benchmark icodeapi against a local mock of icodeshequ.')
+    parser.add_argument('--scenario', action = 'append', choices = list(SCENARIOS), help = 'a scenario to run, can be repeated, all by default')
+    parser.add_argument('--latency', type = float, default = 0.0, help = 'the delay of every response in seconds')
+    parser.add_argument('--scale', type = int, default = 100, help = 'about how many requests a scenario sends')
+    parser.add_argument('--concurrency', type = int, default = 16)
+    parser.add_argument('--backend', choices = ('uvicorn', 'thread'), help = 'the mock server, uvicorn if installed by default')
+    parser.add_argument('--isolate', action = 'store_true', help = 'run every scenario in a new process')
+    parser.add_argument('--imports', action = 'store_true', help = 'measure the import time of icodeapi instead of the scenarios')
+    parser.add_argument('--repeat', type = int, default = 5, help = 'how many new interpreters --imports measures')
+    parser.add_argument('--json', action = 'store_true', help = 'print the results as JSON')
+    args = parser.parse_args(argv)
+    if args.imports:
+        results = runImports(repeat = args.repeat, output = None if args.json else print)
+        if args.json:
+            print(json.dumps([i.toDict() for i in results]))
+        return
+    results = run(args.scenario, args.latency, args.scale, args.concurrency, args.backend, args.isolate, output = None if args.json else print)
+    if args.json:
+        print(json.dumps([i.toDict() for i in results]))
+
+if __name__ == '__main__':
+    main()
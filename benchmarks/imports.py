@@ -0,0 +1,98 @@
+'''
+icodeapi import benchmark.
+
+Measure the import time of icodeapi in new interpreters, like a short-lived CLI job or a serverless handler starts.
+
+```
+python -m icodeapi.benchmarks --imports
+```
+'''
+
+import os, sys, subprocess, statistics
+
+MODULES = ('icodeapi', 'icodeapi.tools')
+
+# Packages which should only be imported when a feature needs them.
+LAZY = ('aiofiles', 'urllib3', 'orjson', 'msgspec', 'numpy', 'pyarrow', 'uvicorn')
+
+class ImportResult():
+    '''
+    The import time of a module, `median` and `best` are in seconds.
+    `modules` is the number of modules imported with it, `loaded` the packages in `LAZY` imported with it.
+    '''
+    __slots__ = ('name', 'median', 'best', 'modules', 'loaded')
+
+    def __init__(self, name : str, median : float, best : float, modules : int, loaded : list):
+        self.name = name
+        self.median = median
+        self.best = best
+        self.modules = modules
+        self.loaded = loaded
+
+    def toDict(self) -> dict:
+        '''
+        This function will return a dict, and the dict always be like:
+        ```python
+        {
+            'name': str,
+            'median': float,  # seconds
+            'best': float,  # seconds
+            'modules': int,
+            'loaded': list  # packages in LAZY
+        }
+        ```
+        '''
+        return {
+            'name' : self.name,
+            'median' : self.median,
+            'best' : self.best,
+            'modules' : self.modules,
+            'loaded' : self.loaded
+        }
+
+    def __str__(self):
+        return (f'{self.name:<16} median {self.median * 1000:>8.2f} ms best {self.best * 1000:>8.2f} ms '
+                f'{self.modules:>4} modules lazy loaded: {", ".join(self.loaded) or "none"}')
+
+def _importOnce(module : str) -> tuple:
+    env = dict(os.environ, PYTHONPATH = os.pathsep.join(i for i in sys.path if i))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                             capture_output = True, text = True, check = True, env = env)
+    cumulative = None
+    names = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        parts = line[12:].split('|')
+        name = parts[2].strip()
+        if not parts[1].strip().isdigit():
+            continue
+        names.append(name)
+        if name == module:
+            cumulative = int(parts[1]) / 1e6
+    if cumulative is None:
+        raise RuntimeError(f'Cannot find the import time of {module}.')
+    return cumulative, names
+
+def importTime(module : str, repeat : int = 5) -> ImportResult:
+    '''
+    Import `module` in `repeat` new interpreters with `python -X importtime`.
+    '''
+    times = []
+    for i in range(max(1, repeat)):
+        seconds, names = _importOnce(module)
+        times.append(seconds)
+    packages = {i.split('.', 1)[0] for i in names}
+    return ImportResult(module, statistics.median(times), min(times), len(names), [i for i in LAZY if i in packages])
+
+def runImports(modules : list = None, repeat : int = 5, output = print) -> list:
+    '''
+    Measure the import time of `modules`, `MODULES` by default, return their `ImportResult`s.
+    '''
+    results = []
+    for module in modules or MODULES:
+        result = importTime(module, repeat)
+        results.append(result)
+        if output:
+            output(str(result))
+    return results
@@ -0,0 +1,320 @@
+'''
+icodeapi benchmarks server.
+
+A local stand-in of icodeshequ, it answers with the real response shapes.
+'''
+
+import json, time, asyncio, hashlib, threading, http.server, urllib.parse
+
+class MockData():
+    '''
+    The data of the mock server.
+
+    There are `works` works of `users` users, every work has `comments` comments with `replies` replies each.
+    A Scratch work has `assets` assets of `assetSize` bytes, its `code` is padded with blocks to about `codeSize` bytes.
+    '''
+    def __init__(self, works : int = 1000, users : int = 50, comments : int = 40, replies : int = 5, messages : int = 60,
+                 assets : int = 12, assetSize : int = 64 * 1024, codeSize : int = 1024 ** 2):
+        self.works = works
+        self.users = users
+        self.comments = comments
+        self.replies = replies
+        self.messages = messages
+        self.assetData = {}
+        for i in range(assets):
+            data = (b'%08d' % i) * (assetSize // 8)
+            self.assetData[hashlib.md5(data).hexdigest() + ('.png' if i % 3 else '.wav')] = data
+        self.code = self._project(codeSize)
+        self.uploads = {}
+        self.__cache = {}
+
+    def _project(self, codeSize : int) -> str:
+        assets = list(self.assetData)
+        blocks = {}
+        project = {
+            'targets' : [
+                {
+                    'isStage' : i == 0,
+                    'name' : 'Stage' if i == 0 else f'Sprite{i}',
+                    'blocks' : blocks if i == 1 else {},
+                    'costumes' : [{'name' : j, 'md5ext' : j, 'assetId' : j.split('.')[0], 'dataFormat' : j.split('.')[1]} for j in assets[i::3] if j.endswith('.png')],
+                    'sounds' : [{'name' : j, 'md5ext' : j, 'assetId' : j.split('.')[0], 'dataFormat' : j.split('.')[1]} for j in assets[i::3] if j.endswith('.wav')]
+                }
+                for i in range(3)
+            ],
+            'meta' : {'semver' : '3.0.0', 'vm' : '0.2.0', 'agent' : 'icodeapi benchmarks'}
+        }
+        block = {'opcode' : 'motion_movesteps', 'next' : None, 'parent' : None, 'inputs' : {'STEPS' : [1, [4, '10']]},
+                 'fields' : {}, 'shadow' : False, 'topLevel' : False}
+        size = len(json.dumps(project))
+        blockSize = len(json.dumps(block)) + 30
+        for i in range(max(0, (codeSize - size) // blockSize)):
+            blocks[f'block{i:012d}'] = block
+        return json.dumps(project)
+
+    def work(self, i : int) -> dict:
+        return {
+            'id' : f'{i:032x}',
+            'title' : f'Work {i}',
+            'imgUrl' : f'https://ydschool-online.nosdn.127.net/svg/{i:032x}.png',
+            'userId' : f'user{i % self.users}',
+            'status' : 2,
+            'likeNum' : i * 7 % 100,
+            'browseNum' : i * 13 % 1000,
+            'enshrineNum' : i * 3 % 50,
+            'forkNum' : i % 10,
+            'userName' : f'User {i % self.users}',
+            'userImage' : 'https://ydschool-online.nosdn.127.net/svg/user.png',
+            'codeLanguage' : 'python' if i % 5 == 0 else 'scratch',
+            'theme' : ('play', 'story', 'art', 'minecraft')[i % 4],
+            'subTheme' : ''
+        }
+
+    def detail(self, workId : str) -> dict:
+        i = int(workId, 16) if workId else 0
+        result = self.work(i)
+        result.update({
+            'description' : 'A work for benchmarks.',
+            'type' : 1,
+            'code' : 'print("hello")\n' if result['codeLanguage'] == 'python' else self.code,
+            'haveLiked' : False,
+            'haveEnshrined' : False,
+            'createTimeStr' : '2024-01-01 00:00:00',
+            'updateTimeStr' : '2024-01-01 00:00:00',
+            'shortLink' : '',
+            'iframeUrl' : '',
+            'scratchFile' : '',
+            'codeType' : 'json',
+            'firstPopups' : False,
+            'forkAuthorizationStatus' : True,
+            'isFirstPublish' : False,
+            'haveReported' : False
+        })
+        return result
+
+    def comment(self, i : int) -> dict:
+        return {'id' : i, 'content' : f'Comment {i}', 'userId' : f'user{i % self.users}', 'name' : f'User {i % self.users}',
+                'image' : '', 'isAuthor' : False, 'praiseNum' : i % 9, 'replyNum' : self.replies, 'time' : 1700000000000 + i,
+                'hasPraised' : False}
+
+    def reply(self, commentId : int, i : int) -> dict:
+        return {'id' : commentId * 1000 + i, 'content' : f'Reply {i}', 'type' : 1, 'commentId' : commentId, 'userId' : f'user{i % self.users}',
+                'name' : f'User {i % self.users}', 'image' : '', 'isAuthor' : False, 'time' : 1700000000000 + i, 'praiseNum' : 0,
+                'hasPraised' : False}
+
+    def message(self, i : int) -> dict:
+        return {'actionUserId' : f'user{i % self.users}', 'actionUserImage' : '', 'actionUserName' : f'User {i % self.users}',
+                'createTime' : str(1700000000000 + i), 'createTimeStr' : '2024-01-01 00:00:00', 'haveRead' : False, 'id' : i, 'type' : 1,
+                'worksId' : f'{i:032x}', 'worksTitle' : f'Work {i}'}
+
+    def personInfo(self, userId : str) -> dict:
+        return {'worksNum' : self.works // self.users, 'viewNum' : 1000, 'praiseNum' : 100, 'enshrinesNum' : 10, 'forkNum' : 5,
+                'userId' : userId, 'img' : '', 'nickName' : userId, 'intro' : ''}
+
+    @staticmethod
+    def _page(items, query : dict) -> list:
+        page = int(query.get('page', 1))
+        size = int(query.get('size', 20))
+        return items[(page - 1) * size : page * size]
+
+    @staticmethod
+    def formParts(contentType : str, body : bytes) -> list:
+        '''
+        The parts of a multipart/form-data `body`, a list of `(headers, value)`, the header names are lower case.
+        '''
+        boundary = b'--' + contentType.partition('boundary=')[2].encode('latin-1')
+        parts = []
+        for part in body.split(boundary)[1:-1]:
+            head, _, value = part[2:-2].partition(b'\r\n\r\n')
+            headers = dict(line.decode('utf-8').split(': ', 1) for line in head.split(b'\r\n'))
+            parts.append(({k.lower() : v for k, v in headers.items()}, value))
+        return parts
+
+    def respond(self, method : str, path : str, query : dict, body : bytes = b'', contentType : str = '') -> tuple:
+        '''
+        Answer a request, return `(status, contentType, body)`.
+
+        A Scratch work is submitted like the real form: every part has `Content-Type: application/octet-stream`,
+        else the answer is 400. An uploaded asset is kept in `uploads`, so it is on the asset host then.
+        The body of a HEAD request is dropped by the server, not here.
+        '''
+        if path.startswith('/svg/'):
+            data = self.assetData.get(path[5:], self.uploads.get(path[5:]))
+            return (200, 'application/octet-stream', data) if data is not None else (404, 'text/plain', b'Not Found')
+        if path.startswith('/nos/scratch/asset/'):
+            md5ext = path[19:].strip('/')
+            self.uploads[md5ext] = body
+            return 200, 'application/json', json.dumps({'code' : 0, 'msg' : 'success', 'data' : {'md5ext' : md5ext}}).encode('utf-8')
+        if path == '/api/work/submit':
+            parts = self.formParts(contentType, body)
+            if not parts or any(headers.get('content-type') != 'application/octet-stream' for headers, value in parts):
+                return 400, 'application/json', b'{"code":400,"msg":"bad form"}'
+            return 200, 'application/json', b'{"code":0,"msg":"success","data":{"id":"00000000000000000000000000000000"}}'
+        if method != 'GET':
+            return 200, 'application/json', b'{"code":0,"msg":"success"}'
+        key = (path, tuple(sorted(query.items())))
+        if (body := self.__cache.get(key)) is not None:
+            return 200, 'application/json', body
+        match path:
+            case '/api/user/info':
+                result = {'code' : 0, 'data' : {'userId' : 'user0', 'userName' : 'User 0'}}
+            case '/api/works/detail':
+                result = {'code' : 0, 'data' : self.detail(query.get('id', ''))}
+            case '/api/index/works/list' | '/api/user/works/list':
+                result = {'code' : 0, 'dataList' : [self.work(i) for i in self._page(range(self.works), query)]}
+            case '/api/user/works/hisWorksList' | '/api/user/works/hisEnshrines':
+                user = int(query.get('userId', 'user0')[4:] or 0)
+                result = {'code' : 0, 'dataList' : [self.work(i) for i in self._page(range(user, self.works, self.users), query)]}
+            case '/api/user/more_works/list':
+                result = {'code' : 0, 'dataList' : [self.work(i) for i in range(6)]}
+            case '/api/user/index/hisStatics':
+                result = {'code' : 0, 'data' : self.personInfo(query.get('userId', ''))}
+            case '/api/works/comment/list':
+                result = {'code' : 0, 'dataList' : [self.comment(i) for i in self._page(range(self.comments), query)]}
+            case '/api/works/reply/list':
+                commentId = int(query.get('commentId', 0))
+                result = {'code' : 0, 'dataList' : [self.reply(commentId, i) for i in self._page(range(self.replies), query)]}
+            case '/api/user/message/commentMessage' | '/api/user/message/enshrinesMessage' | '/api/user/message/systemMessage':
+                result = {'code' : 0, 'dataList' : [self.message(i) for i in self._page(range(self.messages), query)]}
+            case '/api/work/get':
+                result = {'code' : 0, 'data' : {'workid' : query.get('id'), 'title' : 'Work', 'publish' : 1, 'fork' : 1}}
+            case _:
+                return 404, 'application/json', b'{"code":404,"msg":"not found"}'
+        body = json.dumps(result).encode('utf-8')
+        if len(self.__cache) < 4096 and len(body) < 65536:
+            self.__cache[key] = body
+        return 200, 'application/json', body
+
+class MockApp():
+    '''
+    The ASGI app of the mock server, every response is delayed by `latency` seconds.
+    '''
+    def __init__(self, data : MockData = None, latency : float = 0.0):
+        self.data = data or MockData()
+        self.latency = latency
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        query = dict(urllib.parse.parse_qsl(scope['query_string'].decode('latin-1')))
+        contentType = dict(scope['headers']).get(b'content-type', b'').decode('latin-1')
+        status, contentType, body = self.data.respond(scope['method'], scope['path'], query, body, contentType)
+        await send({'type' : 'http.response.start', 'status' : status,
+                    'headers' : [(b'content-type', contentType.encode()), (b'content-length', str(len(body)).encode())]})
+        await send({'type' : 'http.response.body', 'body' : b'' if scope['method'] == 'HEAD' else body})
+
+class MockServer():
+    '''
+    Serve the mock data on `127.0.0.1`, in a background thread.
+
+    `backend` is `'uvicorn'` (needs uvicorn) or `'thread'`, a `ThreadingHTTPServer` which needs nothing, None picks uvicorn if installed.
+
+    ```python
+    with MockServer(latency = 0.02) as server:
+        api = AsyncIcodeAPI(httpxClient = server.asyncClient())
+    ```
+    '''
+    def __init__(self, data : MockData = None, latency : float = 0.0, backend : str = None, port : int = 0):
+        self.app = MockApp(data, latency)
+        self.port = port
+        if backend is None:
+            try:
+                import uvicorn
+                backend = 'uvicorn'
+            except ImportError:
+                backend = 'thread'
+        self.backend = backend
+        self.__server = None
+        self.__thread = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def start(self):
+        match self.backend:
+            case 'uvicorn':
+                import uvicorn, socket
+                sock = socket.socket()
+                sock.bind(('127.0.0.1', self.port))
+                self.port = sock.getsockname()[1]
+                self.__server = uvicorn.Server(uvicorn.Config(self.app, log_level = 'warning', lifespan = 'off', access_log = False))
+                self.__thread = threading.Thread(target = self.__server.run, kwargs = {'sockets' : [sock]}, daemon = True)
+                self.__thread.start()
+                while not self.__server.started:
+                    time.sleep(0.01)
+            case 'thread':
+                app = self.app
+                class Handler(http.server.BaseHTTPRequestHandler):
+                    protocol_version = 'HTTP/1.1'
+                    disable_nagle_algorithm = True
+                    def handle_one_request(self):
+                        self.raw_requestline = self.rfile.readline(65537)
+                        if not self.raw_requestline or not self.parse_request():
+                            self.close_connection = True
+                            return
+                        length = int(self.headers.get('Content-Length') or 0)
+                        body = self.rfile.read(length) if length else b''
+                        if app.latency:
+                            time.sleep(app.latency)
+                        path, _, query = self.path.partition('?')
+                        status, contentType, body = app.data.respond(self.command, path, dict(urllib.parse.parse_qsl(query)), body,
+                                                                     self.headers.get('Content-Type', ''))
+                        self.send_response(status)
+                        self.send_header('Content-Type', contentType)
+                        self.send_header('Content-Length', str(len(body)))
+                        self.end_headers()
+                        if self.command != 'HEAD':
+                            self.wfile.write(body)
+                        self.wfile.flush()
+                    def log_message(self, *args):
+                        pass
+                self.__server = http.server.ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+                self.__server.daemon_threads = True
+                self.port = self.__server.server_address[1]
+                self.__thread = threading.Thread(target = self.__server.serve_forever, daemon = True)
+                self.__thread.start()
+            case _:
+                raise ValueError(f'Unknown backend: {self.backend!r}')
+        return self
+
+    def stop(self):
+        if self.__server is None:
+            return
+        if self.backend == 'uvicorn':
+            self.__server.should_exit = True
+        else:
+            self.__server.shutdown()
+            self.__server.server_close()
+        self.__thread.join(5)
+        self.__server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def client(self, **kwargs):
+        '''
+        A `httpx.Client` sending every request to the server, see `RewriteTransport`.
+        '''
+        import httpx
+        from .transport import RewriteTransport
+        return httpx.Client(transport = RewriteTransport(self.url, httpx.HTTPTransport(**kwargs)))
+
+    def asyncClient(self, **kwargs):
+        '''
+        A `httpx.AsyncClient` sending every request to the server, see `RewriteTransport`.
+        '''
+        import httpx
+        from .transport import AsyncRewriteTransport
+        return httpx.AsyncClient(transport = AsyncRewriteTransport(self.url, httpx.AsyncHTTPTransport(**kwargs)))
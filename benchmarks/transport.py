@@ -0,0 +1,40 @@
+'''
+icodeapi benchmarks transport.
+
+httpx transports sending the requests of every host to the mock server.
+'''
+
+import httpx
+
+def _rewrite(request : httpx.Request, base : httpx.URL):
+    request.url = request.url.copy_with(scheme = base.scheme, host = base.host, port = base.port)
+
+class RewriteTransport(httpx.BaseTransport):
+    '''
+    Send every request to `base`, like `'http://127.0.0.1:8000'`, keeping its path and query.
+    '''
+    def __init__(self, base : str, transport : httpx.BaseTransport = None):
+        self.base = httpx.URL(base)
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request : httpx.Request) -> httpx.Response:
+        _rewrite(request, self.base)
+        return self.transport.handle_request(request)
+
+    def close(self):
+        self.transport.close()
+
+class AsyncRewriteTransport(httpx.AsyncBaseTransport):
+    '''
+    Async version of `RewriteTransport`.
+    '''
+    def __init__(self, base : str, transport : httpx.AsyncBaseTransport = None):
+        self.base = httpx.URL(base)
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request : httpx.Request) -> httpx.Response:
+        _rewrite(request, self.base)
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        await self.transport.aclose()
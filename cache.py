@@ -0,0 +1,110 @@
+'''
+icodeapi response cache.
+
+A TTL + LRU cache for the read-only endpoints of IcodeAPI and AsyncIcodeAPI.
+'''
+
+import time, threading
+from collections import OrderedDict
+
+DEFAULT_TTLS = {
+    'getPersonInfo' : 30,
+    'getWorkDetail' : 10,
+    'getWorkSubmitInfo' : 30,
+    'getMoreWorks' : 30
+}
+
+MISSING = object()
+
+class ResponseCache():
+    '''
+    A TTL + LRU response cache.
+
+    Keys are tuples like `('getWorkDetail', cookie, workId)`, the first value is the endpoint name,
+    the second is the cookie of the user, so users sharing the cache never get the results of each other.
+    `ttls` maps an endpoint name to its TTL in seconds, endpoints without TTL are never cached.
+    When there are more than `maxSize` results, the least recently used one is dropped.
+
+    Cached results are shared, don't change them.
+    '''
+    def __init__(self, maxSize : int = 1024, ttls : dict = None):
+        self.maxSize = maxSize
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.hits = 0
+        self.misses = 0
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key : tuple):
+        '''
+        Get a cached result, return `MISSING` if there is no fresh result.
+        '''
+        with self.__lock:
+            item = self.__data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self.__data[key]
+                self.misses += 1
+                return MISSING
+            self.__data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key : tuple, value):
+        '''
+        Cache a result with the TTL of its endpoint.
+        '''
+        ttl = self.ttls.get(key[0])
+        if not ttl:
+            return
+        with self.__lock:
+            self.__data[key] = (time.monotonic() + ttl, value)
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.maxSize:
+                self.__data.popitem(last = False)
+
+    def invalidate(self, *values, endpoint : str = None) -> int:
+        '''
+        Drop the cached results of `endpoint` (all endpoints if None) whose key contains all `values`.
+
+        Return the number of dropped results.
+        '''
+        with self.__lock:
+            keys = [key for key in self.__data
+                    if (endpoint is None or key[0] == endpoint) and all(value in key[1:] for value in values)]
+            for key in keys:
+                del self.__data[key]
+            return len(keys)
+
+    def clear(self):
+        '''
+        Drop all cached results.
+        '''
+        with self.__lock:
+            self.__data.clear()
+
+    def stats(self) -> dict:
+        '''
+        Get the cache counters.
+
+        This function will return a dict, and the dict always be like:
+        ```python
+        {
+            'hits': int,
+            'misses': int,
+            'size': int,
+            'maxSize': int
+        }
+        ```
+        '''
+        return {
+            'hits' : self.hits,
+            'misses' : self.misses,
+            'size' : len(self.__data),
+            'maxSize' : self.maxSize
+        }
+
+    def __len__(self):
+        return len(self.__data)
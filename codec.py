@@ -0,0 +1,120 @@
+'''
+icodeapi codec.
+
+The JSON decoders of IcodeAPI and AsyncIcodeAPI, the fastest installed backend is used by default.
+'''
+
+import json
+
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+def _available(backend : str) -> bool:
+    try:
+        __import__(backend)
+    except ImportError:
+        return False
+    return True
+
+def defaultBackend() -> str:
+    '''
+    The first installed backend in `BACKENDS`.
+    '''
+    for backend in BACKENDS:
+        if _available(backend):
+            return backend
+    return 'json'
+
+class JSONDecoder():
+    '''
+    A JSON decoder of response bodies.
+
+    `backend` is `'orjson'`, `'msgspec'`, `'json'` or None for `defaultBackend()`.
+
+    `decode` can read only some fields of the result, with msgspec installed the other fields
+    (like the `code` of a work) are skipped in the bytes and never built, other backends decode the whole body first.
+    '''
+    def __init__(self, backend : str = None):
+        self.backend = backend or defaultBackend()
+        match self.backend:
+            case 'orjson':
+                import orjson
+                self.loads = orjson.loads
+            case 'msgspec':
+                import msgspec
+                self.loads = msgspec.json.Decoder().decode
+            case 'json':
+                self.loads = json.loads
+            case _:
+                raise ValueError(f'Unknown JSON backend: {self.backend!r}')
+        self.__typed = {}
+
+    def _typedDecoder(self, key : str, item):
+        '''
+        A msgspec decoder of `{key: item}` or `{key: [item, ...]}`, `item` is a Struct type or a tuple of field names.
+        None without msgspec.
+        '''
+        cacheKey = (key, item)
+        if cacheKey in self.__typed:
+            return self.__typed[cacheKey]
+        try:
+            import msgspec
+        except ImportError:
+            self.__typed[cacheKey] = None
+            return None
+        from typing import Any, Union
+        if isinstance(item, tuple):
+            item = msgspec.defstruct('Item', [(field, Any, None) for field in item])
+        if key is None:
+            decoder = msgspec.json.Decoder(Union[item, list[item], None])
+        else:
+            envelope = msgspec.defstruct('Envelope', [(key, Union[item, list[item], None], None)])
+            decoder = msgspec.json.Decoder(envelope)
+        self.__typed[cacheKey] = decoder
+        return decoder
+
+    def decodeAs(self, data : bytes, type):
+        '''
+        Decode `data` straight into `type`, a msgspec Struct or any type msgspec supports. Needs msgspec.
+        '''
+        import msgspec
+        return msgspec.json.decode(data, type = type)
+
+    def decodeRecords(self, data : bytes, key : str, record : type):
+        '''
+        Decode a response body into `record`, see `records`. `record` can be a `Record` type or a msgspec Struct type
+        from `records.structOf`, structs are decoded straight from the bytes.
+        '''
+        if not hasattr(record, 'fromDict'):
+            result = self._typedDecoder(key, record).decode(data)
+            return result if key is None else getattr(result, key)
+        result = self.loads(data)
+        if key is not None:
+            result = result.get(key)
+        if isinstance(result, list):
+            return [record.fromDict(item) for item in result]
+        return None if result is None else record.fromDict(result)
+
+    def decode(self, data : bytes, key : str = None, fields : tuple = None):
+        '''
+        Decode a response body, return the value of `key` (the whole json if None).
+
+        If `fields` is a tuple of field names, every item of the result is a dict with only these fields.
+        '''
+        if fields:
+            if (decoder := self._typedDecoder(key, fields)) is not None:
+                result = decoder.decode(data)
+                if key is not None:
+                    result = getattr(result, key)
+                if result is None:
+                    return None
+                if isinstance(result, list):
+                    return [{field : getattr(item, field) for field in fields} for item in result]
+                return {field : getattr(result, field) for field in fields}
+        result = self.loads(data)
+        if key is not None:
+            result = result.get(key)
+        if fields and result is not None:
+            if isinstance(result, list):
+                return [{field : item.get(field) for field in fields} for item in result]
+            return {field : result.get(field) for field in fields}
+        return result
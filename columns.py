@@ -0,0 +1,150 @@
+'''
+icodeapi columns.
+
+Collect crawled listings into columns for bulk analysis.
+'''
+
+import sys
+from array import array
+
+WORK_COLUMNS = ('id', 'title', 'userId', 'userName', 'status', 'likeNum', 'browseNum', 'enshrineNum', 'forkNum',
+                'codeLanguage', 'theme', 'subTheme')
+
+NUMERIC_COLUMNS = frozenset(('status', 'likeNum', 'browseNum', 'enshrineNum', 'forkNum', 'type', 'praiseNum', 'replyNum',
+                             'time', 'worksNum', 'viewNum', 'enshrinesNum'))
+
+class ColumnCollector():
+    '''
+    Collect listing items (dicts or records) into one array per field, items with a seen `key` are skipped.
+
+    Numeric fields in `NUMERIC_COLUMNS` are kept in `array('q')`, with a validity bitmap in `masks` (a bit per item,
+    like Arrow, 0 if the number is missing), a missing number is stored as 0 and exported as null.
+    Other fields are kept in lists, strings are interned, so repeated values like `codeLanguage` and `theme` are stored once.
+
+    ```python
+    collector = ColumnCollector()
+    collector.collect(api.iterWorks(maxItems = 10000))
+    table = collector.toArrow()
+    ```
+
+    `toArrow` and `toParquet` need pyarrow, `toNumpy` needs numpy.
+    '''
+    def __init__(self, fields : tuple = WORK_COLUMNS, key : str = 'id'):
+        self.fields = tuple(fields)
+        self.key = key
+        self.columns = {field : array('q') if field in NUMERIC_COLUMNS else [] for field in self.fields}
+        self.masks = {field : bytearray() for field in self.fields if field in NUMERIC_COLUMNS}
+        self.nulls = {field : 0 for field in self.masks}
+        self.duplicates = 0
+        self.__seen = set()
+
+    def add(self, item) -> bool:
+        '''
+        Add an item, return False if its key was seen.
+        '''
+        if self.key is not None:
+            itemKey = item.get(self.key)
+            if itemKey in self.__seen:
+                self.duplicates += 1
+                return False
+            self.__seen.add(itemKey)
+        for field, column in self.columns.items():
+            value = item.get(field)
+            if type(column) is array:
+                index = len(column)
+                mask = self.masks[field]
+                if not index & 7:
+                    mask.append(0)
+                if value is None:
+                    column.append(0)
+                    self.nulls[field] += 1
+                else:
+                    column.append(int(value))
+                    mask[-1] |= 1 << (index & 7)
+            else:
+                column.append(sys.intern(value) if type(value) is str else value)
+        return True
+
+    def collect(self, items) -> int:
+        '''
+        Add all items of an iterable, return the number of added items.
+        '''
+        count = 0
+        for item in items:
+            count += self.add(item)
+        return count
+
+    async def collectAsync(self, items) -> int:
+        '''
+        Add all items of an async iterable, like `AsyncIcodeAPI.iterWorks`, return the number of added items.
+        '''
+        count = 0
+        async for item in items:
+            count += self.add(item)
+        return count
+
+    def __len__(self):
+        return len(self.columns[self.fields[0]]) if self.fields else 0
+
+    def __contains__(self, key) -> bool:
+        return key in self.__seen
+
+    def isValid(self, field : str, index : int) -> bool:
+        '''
+        Whether the value of item `index` in `field` is there, always True for a field which isnt numeric.
+        '''
+        mask = self.masks.get(field)
+        return mask is None or bool(mask[index >> 3] >> (index & 7) & 1)
+
+    def toDict(self) -> dict:
+        '''
+        The columns as a dict of lists, a missing number is None.
+        '''
+        result = {}
+        for field, column in self.columns.items():
+            if self.nulls.get(field):
+                result[field] = [value if self.isValid(field, i) else None for i, value in enumerate(column)]
+            else:
+                result[field] = list(column)
+        return result
+
+    def toArrow(self):
+        '''
+        Export the columns to a `pyarrow.Table`, numeric columns are copied as one block with their validity bitmap,
+        so a missing number is null.
+        '''
+        import pyarrow
+        arrays = {}
+        for field, column in self.columns.items():
+            if type(column) is array:
+                nulls = self.nulls[field]
+                validity = pyarrow.py_buffer(bytes(self.masks[field])) if nulls else None
+                arrays[field] = pyarrow.Array.from_buffers(pyarrow.int64(), len(column), [validity, pyarrow.py_buffer(column.tobytes())], nulls)
+            else:
+                arrays[field] = pyarrow.array(column)
+        return pyarrow.table(arrays)
+
+    def toParquet(self, path, **kwargs):
+        '''
+        Write the columns to a Parquet file, `kwargs` are passed to `pyarrow.parquet.write_table`.
+        '''
+        import pyarrow.parquet
+        pyarrow.parquet.write_table(self.toArrow(), path, **kwargs)
+
+    def toNumpy(self):
+        '''
+        Export the columns to a `numpy.recarray`, numeric columns are int64, other columns are objects.
+        A numeric column with missing numbers is float64 instead, a missing number is NaN.
+        '''
+        import numpy
+        arrays = []
+        for field, column in self.columns.items():
+            if type(column) is not array:
+                arrays.append(numpy.array(column, dtype = object))
+                continue
+            values = numpy.frombuffer(column.tobytes(), dtype = numpy.int64)
+            if self.nulls[field]:
+                valid = numpy.unpackbits(numpy.frombuffer(bytes(self.masks[field]), dtype = numpy.uint8), count = len(column), bitorder = 'little')
+                values = numpy.where(valid.astype(bool), values, numpy.nan)
+            arrays.append(values)
+        return numpy.rec.fromarrays(arrays, names = list(self.fields))
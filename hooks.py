@@ -0,0 +1,66 @@
+'''
+icodeapi hooks.
+
+The request events passed to the hooks of IcodeAPI and AsyncIcodeAPI.
+'''
+
+import time, urllib.parse
+
+HOOK_KINDS = ('request', 'response', 'error')
+
+class Event():
+    '''
+    One attempt of a call.
+
+    `endpoint` is the endpoint name like `'getWorkDetail'`, `params` are the query parameters of the url
+    and the arguments naming what the call is about (`workId`, `userId`, `commentId`, `replyId`, `messageId` or `md5ext`),
+    so they are there too when the ID is sent in the path or the json body.
+    `elapsed` is the time of the attempt in seconds and `size` the bytes of the response body, both set after the response.
+    `request` and `response` are the httpx objects, `error` is the exception raised by the attempt.
+    '''
+    __slots__ = ('call', 'attempt', 'start', 'elapsed', 'status', 'size', 'request', 'response', 'error', '_callParams', '_params')
+
+    def __init__(self, call, attempt : int = 0, params : dict = None):
+        self.call = call
+        self.attempt = attempt
+        self._callParams = params
+        self.start = time.perf_counter()
+        self.elapsed = None
+        self.status = None
+        self.size = None
+        self.request = None
+        self.response = None
+        self.error = None
+        self._params = None
+
+    @property
+    def endpoint(self) -> str:
+        return self.call.endpoint.name
+
+    @property
+    def method(self) -> str:
+        return self.call.endpoint.method
+
+    @property
+    def url(self) -> str:
+        return self.call.url
+
+    @property
+    def params(self) -> dict:
+        if self._params is None:
+            self._params = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(self.call.url).query))
+            if self._callParams:
+                self._params.update(self._callParams)
+        return self._params
+
+    def finish(self, response = None, error : Exception = None):
+        self.elapsed = time.perf_counter() - self.start
+        self.error = error
+        if response is not None:
+            self.response = response
+            self.request = response.request
+            self.status = response.status_code
+            self.size = response.num_bytes_downloaded
+
+    def __repr__(self):
+        return f'Event({self.endpoint}, {self.params}, status={self.status}, elapsed={self.elapsed})'
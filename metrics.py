@@ -0,0 +1,196 @@
+'''
+icodeapi metrics.
+
+Per-endpoint request metrics of IcodeAPI and AsyncIcodeAPI.
+'''
+
+import time, threading, bisect
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+class Sample():
+    '''
+    The measures of one call, passed to the exporters of `Metrics`.
+
+    `latency` covers all attempts, `poolWait` is the time spent waiting for a pooled connection.
+    `status` is None if the call raised, then `error` is the exception.
+    '''
+    __slots__ = ('endpoint', 'method', 'host', 'start', 'latency', 'poolWait', 'status', 'bytesIn', 'bytesOut',
+                 'retries', 'cached', 'error', '_attemptStart', '_waiting')
+
+    def __init__(self, endpoint : str, method : str, host : str):
+        self.endpoint = endpoint
+        self.method = method
+        self.host = host
+        self.start = time.perf_counter()
+        self.latency = 0.0
+        self.poolWait = 0.0
+        self.status = None
+        self.bytesIn = 0
+        self.bytesOut = 0
+        self.retries = 0
+        self.cached = False
+        self.error = None
+        self._attemptStart = self.start
+        self._waiting = False
+
+    def attempt(self):
+        '''
+        Mark the start of an attempt.
+        '''
+        self._attemptStart = time.perf_counter()
+        self._waiting = True
+
+    def trace(self, event : str, info : dict):
+        '''
+        The httpx `trace` extension, the first connection event of an attempt ends the pool wait.
+        '''
+        if self._waiting:
+            self._waiting = False
+            self.poolWait += time.perf_counter() - self._attemptStart
+
+    async def atrace(self, event : str, info : dict):
+        self.trace(event, info)
+
+    def __repr__(self):
+        return f'Sample({self.endpoint}, status={self.status}, latency={self.latency:.4f})'
+
+class Metrics():
+    '''
+    Per-endpoint metrics: calls, errors, status codes, latency histogram, pool wait, bytes in and out, retries and cache hits.
+
+    `buckets` are the upper bounds of the latency histogram in seconds.
+    Every finished call is passed to the functions in `exporters` as a `Sample`,
+    use them to feed Prometheus or OpenTelemetry. An exporter must be fast and must not raise.
+    '''
+    def __init__(self, buckets : tuple = DEFAULT_BUCKETS, exporters : list = None):
+        self.buckets = tuple(sorted(buckets))
+        self.exporters = list(exporters or [])
+        self.__endpoints = {}
+        self.__lock = threading.Lock()
+
+    def addExporter(self, exporter):
+        '''
+        Call `exporter(sample)` after every call.
+        '''
+        self.exporters.append(exporter)
+
+    def start(self, endpoint) -> Sample:
+        '''
+        Start measuring a call of `endpoint`, a `transport.Endpoint`.
+        '''
+        return Sample(endpoint.name, endpoint.method, endpoint.host)
+
+    def _stats(self, endpoint : str) -> dict:
+        if (stats := self.__endpoints.get(endpoint)) is None:
+            stats = self.__endpoints[endpoint] = {
+                'count' : 0,
+                'errors' : 0,
+                'retries' : 0,
+                'cacheHits' : 0,
+                'statuses' : {},
+                'bytesIn' : 0,
+                'bytesOut' : 0,
+                'latencySum' : 0.0,
+                'latencyMax' : 0.0,
+                'poolWait' : 0.0,
+                'histogram' : [0] * (len(self.buckets) + 1)
+            }
+        return stats
+
+    def finish(self, sample : Sample, response = None, error : Exception = None):
+        '''
+        Record a finished call, with its last response or the exception it raised.
+        '''
+        sample.latency = time.perf_counter() - sample.start
+        sample.error = error
+        if response is not None:
+            sample.status = response.status_code
+            sample.bytesIn = response.num_bytes_downloaded
+            sample.bytesOut = int(response.request.headers.get('Content-Length', 0))
+        with self.__lock:
+            stats = self._stats(sample.endpoint)
+            stats['count'] += 1
+            stats['retries'] += sample.retries
+            if error is not None:
+                stats['errors'] += 1
+            else:
+                stats['statuses'][sample.status] = stats['statuses'].get(sample.status, 0) + 1
+            stats['bytesIn'] += sample.bytesIn
+            stats['bytesOut'] += sample.bytesOut
+            stats['latencySum'] += sample.latency
+            stats['latencyMax'] = max(stats['latencyMax'], sample.latency)
+            stats['poolWait'] += sample.poolWait
+            stats['histogram'][bisect.bisect_left(self.buckets, sample.latency)] += 1
+        for exporter in self.exporters:
+            exporter(sample)
+
+    def cacheHit(self, endpoint : str):
+        '''
+        Record a call answered by the response cache.
+        '''
+        with self.__lock:
+            self._stats(endpoint)['cacheHits'] += 1
+        if self.exporters:
+            sample = Sample(endpoint, None, None)
+            sample.cached = True
+            for exporter in self.exporters:
+                exporter(sample)
+
+    def quantile(self, endpoint : str, q : float) -> float:
+        '''
+        Estimate the `q` quantile of the latency of `endpoint` from the histogram, the upper bound of its bucket.
+        '''
+        with self.__lock:
+            stats = self.__endpoints.get(endpoint)
+            if not stats or not stats['count']:
+                return None
+            histogram = list(stats['histogram'])
+            count = stats['count']
+        seen = 0
+        for bound, n in zip(self.buckets + (float('inf'),), histogram):
+            seen += n
+            if seen >= q * count:
+                return bound
+        return float('inf')
+
+    def snapshot(self) -> dict:
+        '''
+        Get the metrics of every endpoint.
+
+        This function will return a dict, and the dict always be like:
+        ```python
+        {
+            'getWorks': {
+                'count': int,
+                'errors': int,
+                'retries': int,
+                'cacheHits': int,
+                'statuses': dict,  # status code: count
+                'bytesIn': int,
+                'bytesOut': int,
+                'latencySum': float,
+                'latencyMax': float,
+                'latencyMean': float,
+                'poolWait': float,
+                'histogram': dict  # upper bound in seconds: count of calls in the bucket, the last bound is inf
+            }
+        }
+        ```
+        '''
+        with self.__lock:
+            result = {}
+            for endpoint, stats in self.__endpoints.items():
+                item = dict(stats)
+                item['statuses'] = dict(stats['statuses'])
+                item['latencyMean'] = stats['latencySum'] / stats['count'] if stats['count'] else 0.0
+                item['histogram'] = dict(zip(self.buckets + (float('inf'),), stats['histogram']))
+                result[endpoint] = item
+            return result
+
+    def reset(self):
+        '''
+        Drop all recorded metrics.
+        '''
+        with self.__lock:
+            self.__endpoints.clear()
@@ -0,0 +1,96 @@
+'''
+icodeapi multipart.
+
+A streaming multipart/form-data body, it is encoded chunk by chunk while it is sent.
+'''
+
+import os, mimetypes
+
+CHUNK_SIZE = 65536
+
+def _quote(name : str) -> str:
+    return name.replace('\r', '%0D').replace('\n', '%0A').replace('"', '%22')
+
+def _guessType(fileName : str) -> str:
+    return (mimetypes.guess_type(fileName)[0] if fileName else None) or 'application/octet-stream'
+
+def _encodedLength(value : str, chunkSize : int) -> int:
+    if value.isascii():
+        return len(value)
+    return sum(len(value[i : i + chunkSize].encode('utf-8')) for i in range(0, len(value), chunkSize))
+
+class MultipartEncoder():
+    '''
+    `fields` as a multipart/form-data body, like `urllib3.encode_multipart_formdata(fields)`.
+    `fields` is a list of `(name, value)`, a value is str, bytes or int,
+    or a tuple `(fileName, value)` or `(fileName, value, contentType)` like urllib3, then the part has a `Content-Type` header
+    (guessed from `fileName`, `application/octet-stream` if `fileName` is None) and a `filename` if `fileName` isnt None.
+
+    Values are encoded `chunkSize` characters at a time while the body is iterated, the whole body is never built.
+    `contentLength` is known before, and the body can be iterated again, so it can be retried.
+
+    Send it as `content` with httpx.Client, or send `asyncStream()` with httpx.AsyncClient, together with `headers`.
+    '''
+    __slots__ = ('fields', 'boundary', 'chunkSize', 'contentLength')
+
+    def __init__(self, fields : list, boundary : str = None, chunkSize : int = CHUNK_SIZE):
+        self.fields = []
+        self.boundary = boundary or os.urandom(16).hex()
+        self.chunkSize = chunkSize
+        length = 0
+        for name, value in fields:
+            head = f'--{self.boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"'
+            if isinstance(value, tuple):
+                fileName, value, *contentType = value
+                if fileName is not None:
+                    head += f'; filename="{_quote(fileName)}"'
+                head += f'\r\nContent-Type: {contentType[0] if contentType else _guessType(fileName)}'
+            head = (head + '\r\n\r\n').encode('utf-8')
+            if isinstance(value, int):
+                value = str(value)
+            elif not isinstance(value, (str, bytes)):
+                raise TypeError(f'The value of {name} must be str, bytes or int, not {type(value).__name__}')
+            self.fields.append((head, value))
+            length += len(head) + (len(value) if isinstance(value, bytes) else _encodedLength(value, chunkSize)) + 2
+        self.contentLength = length + len(self.boundary) + 6
+
+    @property
+    def contentType(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    @property
+    def headers(self) -> dict:
+        return {'Content-Type' : self.contentType, 'Content-Length' : str(self.contentLength)}
+
+    def __iter__(self):
+        chunkSize = self.chunkSize
+        pending = b''
+        for head, value in self.fields:
+            pending += head
+            for i in range(0, len(value), chunkSize):
+                chunk = value[i : i + chunkSize]
+                pending += chunk if isinstance(chunk, bytes) else chunk.encode('utf-8')
+                if len(pending) >= chunkSize:
+                    yield pending
+                    pending = b''
+            pending += b'\r\n'
+        yield pending + f'--{self.boundary}--\r\n'.encode('utf-8')
+
+    def asyncStream(self) -> 'AsyncMultipartStream':
+        '''
+        The body as an async iterable, for httpx.AsyncClient.
+        '''
+        return AsyncMultipartStream(self)
+
+class AsyncMultipartStream():
+    '''
+    Async version of the body of a `MultipartEncoder`.
+    '''
+    __slots__ = ('encoder',)
+
+    def __init__(self, encoder : MultipartEncoder):
+        self.encoder = encoder
+
+    async def __aiter__(self):
+        for chunk in self.encoder:
+            yield chunk
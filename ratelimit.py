@@ -0,0 +1,169 @@
+'''
+icodeapi rate limit.
+
+Client-side throttling and retries of IcodeAPI and AsyncIcodeAPI.
+'''
+
+import time, random, threading, email.utils
+import httpx
+
+THROTTLE_STATUSES = frozenset((429, 503))
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+class TokenBucket():
+    '''
+    A token bucket of `rate` requests per second with bursts of `burst` requests.
+
+    Requests reserve tokens in advance, so waiting requests are served in order without busy waiting.
+    '''
+    def __init__(self, rate : float, burst : int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.pausedUntil = 0.0
+        self.__lock = threading.Lock()
+
+    def reserve(self) -> float:
+        '''
+        Take a token, return the seconds to wait before sending the request.
+        '''
+        with self.__lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate) - 1
+            self.updated = now
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.pausedUntil - now)
+
+    def pause(self, seconds : float):
+        '''
+        Send nothing for `seconds`, like when the server asks to retry after some time.
+        '''
+        with self.__lock:
+            self.pausedUntil = max(self.pausedUntil, time.monotonic() + seconds)
+
+    def setRate(self, rate : float):
+        with self.__lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.rate = rate
+
+class RateLimiter():
+    '''
+    A token bucket per host.
+
+    `hostRates` maps a host to its requests per second, other hosts get `rate`.
+    If `adaptive` is True, the rate of a host is halved when it answers 429 or 503,
+    and grows back by `increase` of its start rate after every successful response (AIMD), never below `minRate`.
+
+    Use `RateLimiter.shared()` to share one limiter by all users in the process.
+    '''
+    _shared = None
+    _sharedLock = threading.Lock()
+
+    def __init__(self, rate : float = 10, burst : int = 20, hostRates : dict = None, adaptive : bool = True,
+                 minRate : float = 0.5, increase : float = 0.05):
+        self.rate = rate
+        self.burst = burst
+        self.hostRates = dict(hostRates or {})
+        self.adaptive = adaptive
+        self.minRate = minRate
+        self.increase = increase
+        self.__buckets = {}
+        self.__lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'RateLimiter':
+        '''
+        The process-wide limiter.
+        '''
+        with cls._sharedLock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def bucket(self, host : str) -> TokenBucket:
+        if (bucket := self.__buckets.get(host)) is None:
+            with self.__lock:
+                if (bucket := self.__buckets.get(host)) is None:
+                    bucket = self.__buckets[host] = TokenBucket(self.hostRates.get(host, self.rate), self.burst)
+        return bucket
+
+    def reserve(self, host : str) -> float:
+        '''
+        Take a token of `host`, return the seconds to wait before sending the request.
+        '''
+        return self.bucket(host).reserve()
+
+    def wait(self, host : str):
+        '''
+        Block until a request to `host` can be sent.
+        '''
+        if (delay := self.reserve(host)) > 0:
+            time.sleep(delay)
+
+    def feedback(self, host : str, statusCode : int, retryAfter : float = None):
+        '''
+        Adapt the rate of `host` to a response.
+        '''
+        bucket = self.bucket(host)
+        if retryAfter:
+            bucket.pause(retryAfter)
+        if not self.adaptive:
+            return
+        startRate = self.hostRates.get(host, self.rate)
+        if statusCode in THROTTLE_STATUSES:
+            bucket.setRate(max(self.minRate, bucket.rate / 2))
+        elif statusCode < 400 and bucket.rate < startRate:
+            bucket.setRate(min(startRate, bucket.rate + startRate * self.increase))
+
+    def rates(self) -> dict:
+        '''
+        The current rate of every host.
+        '''
+        return {host : bucket.rate for host, bucket in self.__buckets.items()}
+
+def retryAfterOf(response : httpx.Response) -> float:
+    '''
+    The seconds in the `Retry-After` header of `response`, None if there is none.
+    '''
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy():
+    '''
+    When and how long to wait before sending a request again.
+
+    A request is retried at most `retries` times on a response status in `statuses` or a connection error,
+    only if its method is in `methods`. The delay is a random time up to `backoff * 2 ** attempt` seconds (full jitter),
+    at most `maxBackoff`, or the `Retry-After` of the response.
+    '''
+    def __init__(self, retries : int = 3, backoff : float = 0.5, maxBackoff : float = 30, statuses = RETRY_STATUSES,
+                 methods = ('GET', 'HEAD')):
+        self.retries = retries
+        self.backoff = backoff
+        self.maxBackoff = maxBackoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(methods)
+
+    def shouldRetry(self, method : str, attempt : int, response : httpx.Response = None, error : Exception = None) -> bool:
+        if attempt >= self.retries or method not in self.methods:
+            return False
+        if error is not None:
+            return isinstance(error, httpx.TransportError)
+        return response.status_code in self.statuses
+
+    def delay(self, attempt : int, response : httpx.Response = None) -> float:
+        if response is not None and (retryAfter := retryAfterOf(response)) is not None:
+            return min(retryAfter, self.maxBackoff)
+        return random.uniform(0, min(self.maxBackoff, self.backoff * 2 ** attempt))
@@ -0,0 +1,154 @@
+'''
+icodeapi records.
+
+Small, slotted result types for the read endpoints of IcodeAPI and AsyncIcodeAPI, used instead of dicts when `records` is set.
+'''
+
+class Record():
+    '''
+    A result with fixed fields.
+
+    A record can be read like the dict it replaces: `record['title']`, `record.get('title')`, `'title' in record`,
+    and also as attributes: `record.title`. Fields missing in the response are None, unknown fields are dropped.
+    '''
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        for field in self.__slots__:
+            setattr(self, field, kwargs.get(field))
+
+    @classmethod
+    def fromDict(cls, data : dict) -> 'Record':
+        record = cls.__new__(cls)
+        for field in cls.__slots__:
+            setattr(record, field, data.get(field))
+        return record
+
+    def get(self, key : str, default = None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def __getitem__(self, key : str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key : str) -> bool:
+        return key in self.__slots__
+
+    def keys(self) -> tuple:
+        return self.__slots__
+
+    def values(self) -> list:
+        return [getattr(self, field) for field in self.__slots__]
+
+    def items(self) -> list:
+        return [(field, getattr(self, field)) for field in self.__slots__]
+
+    def toDict(self) -> dict:
+        return dict(self.items())
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            return type(self) is type(other) and self.values() == other.values()
+        if isinstance(other, dict):
+            return self.toDict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(f"{k}={v!r}" for k, v in self.items())})'
+
+class Work(Record):
+    '''
+    A work in a list, like the items of `getWorks`, `getMyWorks`, `getPersonWorks`, `getPersonEnshrines` and `getMoreWorks`.
+    '''
+    __slots__ = ('id', 'title', 'imgUrl', 'userId', 'status', 'likeNum', 'browseNum', 'enshrineNum', 'forkNum',
+                 'userName', 'userImage', 'codeLanguage', 'theme', 'subTheme')
+
+class WorkDetail(Record):
+    '''
+    The result of `getWorkDetail`.
+    '''
+    __slots__ = ('id', 'title', 'imgUrl', 'description', 'type', 'userId', 'status', 'likeNum', 'browseNum', 'enshrineNum',
+                 'code', 'userName', 'userImage', 'haveLiked', 'haveEnshrined', 'createTimeStr', 'updateTimeStr', 'codeLanguage',
+                 'shortLink', 'theme', 'subTheme', 'iframeUrl', 'scratchFile', 'codeType', 'firstPopups', 'forkAuthorizationStatus',
+                 'isFirstPublish', 'haveReported')
+
+class Comment(Record):
+    '''
+    An item of `getWorkComments`.
+    '''
+    __slots__ = ('id', 'content', 'userId', 'name', 'image', 'isAuthor', 'praiseNum', 'replyNum', 'time', 'hasPraised')
+
+class Reply(Record):
+    '''
+    An item of `getReplies`, `replyUserId`, `replyName` and `replyImage` are None for a reply to a comment.
+    '''
+    __slots__ = ('id', 'content', 'type', 'commentId', 'userId', 'name', 'image', 'isAuthor',
+                 'replyUserId', 'replyName', 'replyImage', 'time', 'praiseNum', 'hasPraised')
+
+class Message(Record):
+    '''
+    An item of `getMessages`.
+    '''
+    __slots__ = ('id', 'type', 'actionUserId', 'actionUserImage', 'actionUserName', 'createTime', 'createTimeStr',
+                 'haveRead', 'worksId', 'worksTitle')
+
+class PersonInfo(Record):
+    '''
+    The result of `getPersonInfo`.
+    '''
+    __slots__ = ('worksNum', 'viewNum', 'praiseNum', 'enshrinesNum', 'forkNum', 'userId', 'img', 'nickName', 'intro')
+
+RECORDS = {
+    'getWorkDetail' : WorkDetail,
+    'getWorkComments' : Comment,
+    'getMoreWorks' : Work,
+    'getWorks' : Work,
+    'getMyWorks' : Work,
+    'getPersonInfo' : PersonInfo,
+    'getPersonWorks' : Work,
+    'getPersonEnshrines' : Work,
+    'getReplies' : Reply,
+    'getMessages.reply' : Message,
+    'getMessages.enshrine' : Message,
+    'getMessages.system' : Message
+}
+
+_structs = {}
+
+def structOf(record : type) -> type:
+    '''
+    The msgspec Struct type with the fields of `record`, it can be read like a record. Needs msgspec.
+    '''
+    if record in _structs:
+        return _structs[record]
+    import msgspec
+    from typing import Any
+
+    class StructRecord(msgspec.Struct, gc = False):
+        def get(self, key : str, default = None):
+            return getattr(self, key, default) if key in self.__struct_fields__ else default
+
+        def __getitem__(self, key : str):
+            if key not in self.__struct_fields__:
+                raise KeyError(key)
+            return getattr(self, key)
+
+        def __contains__(self, key : str) -> bool:
+            return key in self.__struct_fields__
+
+        def keys(self) -> tuple:
+            return self.__struct_fields__
+
+        def toDict(self) -> dict:
+            return msgspec.structs.asdict(self)
+
+    struct = msgspec.defstruct(record.__name__, [(field, Any, None) for field in record.__slots__], bases = (StructRecord,), gc = False)
+    _structs[record] = struct
+    return struct
@@ -0,0 +1,65 @@
+'''
+icodeapi session.
+
+A local file keeping the login of a user between runs.
+'''
+
+import os, json, time
+from typing import Union
+
+class SessionFile():
+    '''
+    A session file at `path`, it keeps the cookie and the `login` result of a user for `ttl` seconds.
+
+    The file holds the cookie, it is only readable by its owner.
+    '''
+    def __init__(self, path : str, ttl : Union[int, float] = 86400):
+        self.path = os.path.abspath(path)
+        self.ttl = ttl
+
+    def load(self, cookie : bytes = b'') -> dict:
+        '''
+        Get the saved session, return None if there is none, it expired, or its cookie is not `cookie`.
+        An empty `cookie` matches any saved cookie.
+
+        This function will return a dict, and the dict always be like:
+        ```python
+        {
+            'cookie': bytes,
+            'info': dict,  # the result of login
+            'expires': float  # time.time() when the session expires
+        }
+        ```
+        '''
+        try:
+            with open(self.path, 'r', encoding = 'utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('expires', 0) < time.time() or not isinstance(data.get('info'), dict):
+            return None
+        saved = str(data.get('cookie', '')).encode('utf-8')
+        if cookie and cookie != saved:
+            return None
+        return {'cookie' : saved, 'info' : data['info'], 'expires' : data['expires']}
+
+    def save(self, cookie : bytes, info : dict):
+        '''
+        Save a session, it expires after `ttl` seconds.
+        '''
+        data = {'cookie' : cookie.decode('utf-8'), 'info' : info, 'expires' : time.time() + self.ttl}
+        os.makedirs(os.path.dirname(self.path), exist_ok = True)
+        tmpPath = f'{self.path}.{os.getpid()}.tmp'
+        fd = os.open(tmpPath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, 'w', encoding = 'utf-8') as f:
+            json.dump(data, f, ensure_ascii = False)
+        os.replace(tmpPath, self.path)
+
+    def clear(self):
+        '''
+        Remove the saved session.
+        '''
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -4,7 +4,7 @@ icodeapi tools.
 need aiofiles.
 '''
 
-import os, zipfile, shutil, json, aiofiles, asyncio, time
+import os, io, re, json, asyncio, time, itertools, contextlib, tempfile, hashlib, concurrent.futures
 from typing import Union
 from . import *
 
@@ -13,76 +13,402 @@ class ALL_PAGES():
 
 INFINITY = 999999999
 
-async def DownloadWork(workId : str, path : str, api : AsyncIcodeAPI = None):
+STORED_FORMATS = {'png', 'jpg', 'jpeg', 'gif', 'mp3', 'wav', 'ogg'}
+
+SPOOL_SIZE = 1024 ** 2
+CHUNK_SIZE = 65536
+
+MD5EXT = re.compile(r'"md5ext"\s*:\s*"([^"\\]*)"')
+
+def _safeName(name : str) -> str:
+    for i in '\\/:*?"<>|':
+        name = name.replace(i, '_')
+    return name or 'untitled'
+
+def _assetItems(project : dict):
+    for target in project.get('targets', []):
+        for item in target.get('costumes', []) + target.get('sounds', []):
+            yield item.get('md5ext') or f"{item.get('assetId')}.{item.get('dataFormat')}", item
+
+def ScratchManifest(code : Union[str, bytes]) -> list:
+    '''
+    Get the assets of a Scratch project from its project.json, without building the project.
+
+    This function will return a list of `(md5ext, dataFormat)`, every asset once, in the order of the project.
+
+    Only the `md5ext` fields are scanned, if some costume or sound has no `md5ext`, the project is parsed.
+    It is a plain function, so it can run in a thread or process pool.
+    '''
+    if isinstance(code, (bytes, bytearray)):
+        code = code.decode('utf-8')
+    names = MD5EXT.findall(code)
+    if len(names) != code.count('"assetId"'):
+        names = [name for name, item in _assetItems(json.loads(code))]
+    return [(i, i.rsplit('.', 1)[-1]) for i in dict.fromkeys(names)]
+
+async def _inThread(func, *args):
+    '''
+    Run `func(*args)` in a thread, if the caller is cancelled, the thread is waited for before raising,
+    so the zip file is never closed while a thread writes to it.
+    '''
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+def _writeAsset(zf, info, src):
+    import shutil
+    with src, zf.open(info, 'w') as dst:
+        shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+async def _writeScratch(api : AsyncIcodeAPI, code : str, out, getAsset, concurrency : int, progress, executor : concurrent.futures.Executor = None):
+    '''
+    Write the .sb3 archive of `code` to `out`, compressing and writing the archive run in threads, one at a time.
+    '''
+    import zipfile
+    assets = [i for i, dataFormat in await asyncio.get_running_loop().run_in_executor(executor, ScratchManifest, code)]
+    done = 0
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as zf:
+        await _inThread(zf.writestr, 'project.json', code)
+        async with contextlib.aclosing(api.gatherMany(getAsset, assets, concurrency)) as results:
+            async for i in results:
+                if not i.ok:
+                    raise i.error
+                info = zipfile.ZipInfo(i.item, time.localtime(time.time())[:6])
+                info.compress_type = zipfile.ZIP_STORED if i.item.rsplit('.', 1)[-1].lower() in STORED_FORMATS else zipfile.ZIP_DEFLATED
+                info.external_attr = 0o600 << 16
+                await _inThread(_writeAsset, zf, info, i.result)
+                done += 1
+                if progress:
+                    progress(done, len(assets))
+
+def _assetGetter(api : AsyncIcodeAPI, assetStore : AssetStore = None, limiter : asyncio.Semaphore = None):
+    '''
+    Build `getAsset(md5ext)`, it returns the asset as a readable file: a mmap of the stored asset,
+    or a spooled file the asset is streamed into, kept in memory up to `SPOOL_SIZE` bytes.
+
+    Assets are read from `assetStore` (or `api.assetStore`) first, downloaded assets are stored in it.
+    '''
+    store = api.assetStore if assetStore is None else assetStore
+    async def getAsset(md5ext):
+        async with limiter or contextlib.nullcontext():
+            if store is not None and (mm := await asyncio.to_thread(store.open, md5ext)) is not None:
+                return mm
+            spool = tempfile.SpooledTemporaryFile(SPOOL_SIZE)
+            try:
+                if store is api.assetStore:
+                    await api.streamScratchAsset(md5ext, spool, CHUNK_SIZE)
+                else:
+                    with store.writer(md5ext) as storeWrite:
+                        def tee(chunk):
+                            spool.write(chunk)
+                            storeWrite(chunk)
+                        await api.streamScratchAsset(md5ext, tee, CHUNK_SIZE)
+            except BaseException:
+                spool.close()
+                raise
+            spool.seek(0)
+            return spool
+    return getAsset
+
+async def _saveWork(api : AsyncIcodeAPI, dt : dict, path, getAsset, concurrency : int = 16, progress = None, fileName : str = None,
+                    executor : concurrent.futures.Executor = None):
+    '''
+    Save a work from its `getWorkDetail` result, see `DownloadWork`.
+
+    A file is written to `{filePath}.tmp` and replaces `filePath` only when it is complete,
+    so a failed save never leaves a broken file or deletes the file saved before.
+    '''
+    match dt.get('codeLanguage'):
+        case 'scratch':
+            suffix = '.sb3'
+        case 'python':
+            suffix = '.py'
+        case _:
+            raise TypeError("Don't support to download blocky works")
+    if suffix == '.py':
+        data = dt.get('code').replace('\n\r', '\n').encode('utf-8')
+        if path is None:
+            return data
+        if hasattr(path, 'write'):
+            path.write(data)
+            return path
+    if path is None:
+        out = io.BytesIO()
+        await _writeScratch(api, dt.get('code'), out, getAsset, concurrency, progress, executor)
+        return out.getvalue()
+    if hasattr(path, 'write'):
+        await _writeScratch(api, dt.get('code'), path, getAsset, concurrency, progress, executor)
+        return path
+    filePath = os.path.join(path, (fileName or _safeName(dt.get('title'))) + suffix)
+    tmpPath = filePath + '.tmp'
+    try:
+        if suffix == '.py':
+            import aiofiles
+            async with aiofiles.open(tmpPath, 'wb') as f:
+                await f.write(data)
+        else:
+            with open(tmpPath, 'wb') as f:
+                await _writeScratch(api, dt.get('code'), f, getAsset, concurrency, progress, executor)
+        os.replace(tmpPath, filePath)
+    except BaseException:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+        raise
+    return filePath
+
+async def _workDetail(api : AsyncIcodeAPI, workId : str, addBrowseNum : bool = True) -> dict:
+    '''
+    Get the `getWorkDetail` result of a work, the response is spooled and decoded in a thread, not on the event loop.
+    '''
+    with tempfile.SpooledTemporaryFile(SPOOL_SIZE) as spool:
+        await api.streamWorkDetail(workId, spool, addBrowseNum, CHUNK_SIZE)
+        spool.seek(0)
+        return (await asyncio.to_thread(lambda: api.decoder.loads(spool.read()))).get('data')
+
+async def DownloadWork(workId : str, path = None, api : AsyncIcodeAPI = None, assetStore : AssetStore = None,
+                       concurrency : int = 16, progress = None, executor : concurrent.futures.Executor = None):
     '''
     Download a work to your pc.
+
+    If `path` is a directory, the work is saved as `{title}.sb3` or `{title}.py` in it, and the file path is returned.
+    If `path` is a file-like object, the work is written to it. If `path` is None, the work is returned as bytes.
+
+    A Scratch work is written into the .sb3 archive in one pass, assets are added as they arrive.
+    Already compressed assets (png, mp3, wav...) are stored, not deflated.
+    The assets are downloaded once per md5ext, at most `concurrency` at the same time.
+    The work detail and the assets are streamed, an asset bigger than `SPOOL_SIZE` is spooled to a temporary file.
+    `progress(done, total)` is called after each asset is saved.
+
+    Scratch assets are read from `assetStore` (or `api.assetStore`) first, downloaded assets are stored in it.
+
+    The work detail is decoded in a thread, the assets of the project are found by `ScratchManifest` in `executor`
+    (the default thread pool if None, a process pool keeps it out of this process), so the event loop is not blocked.
     '''
     if api == None:
-        api = AsyncIcodeAPI()
+        api = AsyncIcodeAPI(assetStore = assetStore)
         close = 1
     else:
         close = 0
-    if path[-1] != '\\':
-        path += '\\'
-    dt = await api.getWorkDetail(workId)
-    title = dt.get('title')
-    if dt.get('codeLanguage') == 'scratch':
-        def zipDir(dirpath, outFullName):
-            """
-            这段代码是CSDN上抄的毕竟我懒.
-            压缩指定文件夹
-            :param dirpath: 目标文件夹路径
-            :param outFullName: 压缩文件保存路径+xxxx.zip
-            :return: 无
-            """
-            zip = zipfile.ZipFile(outFullName, "w", zipfile.ZIP_DEFLATED)
-            for path, dirnames, filenames in os.walk(dirpath):
-                # 去掉目标跟路径，只对目标文件夹下边的文件及文件夹进行压缩
-                fpath = path.replace(dirpath, '')
-        
-                for filename in filenames:
-                    zip.write(os.path.join(path, filename), os.path.join(fpath, filename))
-            zip.close()
-        path += f'{title}\\'
-        code = json.loads(dt.get('code'))
-        if os.path.exists(path):
-            shutil.rmtree(path)
-        if os.path.exists(path[:0-(len(title)+1):] + f'{title}.zip'):
-            os.remove(path[:0-(len(title)+1):] + f'{title}.zip')
-        if os.path.exists(path[:0-(len(title)+1):] + f'{title}.sb3'):
-            os.remove(path[:0-(len(title)+1):] + f'{title}.sb3')
-        os.makedirs(path)
-        async with aiofiles.open(path + "project.json", 'w', encoding = 'utf-8') as f:
-            await f.write(dt.get('code'))
-        for i in code['targets']:
-            for j in i.get('costumes'):
-                if j.get('dataFormat') == 'svg':
-                    async with aiofiles.open(path + j.get('md5ext'), 'w', encoding ='utf-8') as f:
-                        fileData = await api.getScratchAsset(j.get('md5ext'))
-                        await f.write(fileData.decode('utf-8'))
-                else:
-                    async with aiofiles.open(path + j.get('md5ext'), 'wb') as f:
-                        fileData = await api.getScratchAsset(j.get('md5ext'))
-                        await f.write(fileData)
-            for k in i['sounds']:
-                async with aiofiles.open(path + k.get('md5ext'), 'wb') as f:
-                    fileData = await api.getScratchAsset(k.get('md5ext'))
-                    await f.write(fileData)
-        zipDir(path, path[:0-(len(title)+1):] + f'{title}.zip')
-        shutil.rmtree(path)
-        os.chdir(path[:0-(len(title)+1):])
-        os.rename(path[:0-(len(title)+1):] + f'{title}.zip', f'{title}.sb3')
-    elif dt.get('codeLanguage') == 'python':
-        path += f'{title}.py'
-        code = dt.get('code')
-        async with aiofiles.open(path, 'w', encoding ='utf-8') as f:
-            await f.write(code.replace('\n\r', '\n'))
+    getAsset = _assetGetter(api, assetStore)
+    try:
+        dt = await _workDetail(api, workId)
+        return await _saveWork(api, dt, path, getAsset, concurrency, progress, executor = executor)
+    finally:
+        if close:
+            await api.closeClient()
+
+def _openScratch(path) -> tuple:
+    import zipfile
+    zf = zipfile.ZipFile(io.BytesIO(path) if isinstance(path, (bytes, bytearray)) else path)
+    try:
+        project = json.loads(zf.read('project.json'))
+        refs = {}
+        for name, item in _assetItems(project):
+            refs.setdefault(name, []).append(item)
+    except BaseException:
+        zf.close()
+        raise
+    return zf, project, refs
+
+def _hashAsset(zf, name : str) -> str:
+    md5 = hashlib.md5()
+    with zf.open(name) as f:
+        while chunk := f.read(CHUNK_SIZE):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+async def UploadWork(path,
+                     api : AsyncIcodeAPI,
+                     workId : str = None,
+                     title : str = None,
+                     description : str = 'Project Description',
+                     publish : int = 1,
+                     fork : int = 0,
+                     thumbnail : str = None,
+                     concurrency : int = 8,
+                     hashWorkers : int = None,
+                     progress = None) -> dict:
+    '''
+    Publish a Scratch work from your pc, the inverse of `DownloadWork`.
+
+    `path` is the .sb3 file path, a file-like object or bytes. If `workId` isnt None, the work is resubmitted.
+    `title` is the file name of `path` by default, see `submitWork` for the other arguments.
+
+    The assets are hashed and read in `hashWorkers` threads, an asset not named by its md5 is renamed in the project.
+    Assets already on the asset host (checked by md5ext with `hasScratchAsset`) are not uploaded again,
+    the others are uploaded at most `concurrency` at the same time and checked on the asset host again,
+    then the work is submitted. If an asset fails, the work is not submitted.
+    `progress(done, total)` is called after each asset is uploaded.
+
+    This function will return a dict, and the dict always be like:
+    ```python
+    {
+        'result': dict,  # the result of submitWork
+        'assets': int,  # the number of assets of the work
+        'uploaded': list  # the md5ext of the uploaded assets
+    }
+    ```
+    '''
+    zf, project, refs = await asyncio.to_thread(_openScratch, path)
+    try:
+        names = set(zf.namelist())
+        local = [i for i in refs if i in names]
+        loop = asyncio.get_running_loop()
+        with concurrent.futures.ThreadPoolExecutor(hashWorkers) as pool:
+            hashes = await asyncio.gather(*(loop.run_in_executor(pool, _hashAsset, zf, i) for i in local))
+            assets = {i : None for i in refs if i not in names}
+            for name, md5 in zip(local, hashes):
+                md5ext = f'{md5}.{name.rsplit(".", 1)[-1]}'
+                assets[md5ext] = name
+                if md5ext != name:
+                    for item in refs[name]:
+                        item['assetId'] = md5
+                        item['md5ext'] = md5ext
+            missing = []
+            async with contextlib.aclosing(api.gatherMany(api.hasScratchAsset, list(assets), concurrency)) as results:
+                async for i in results:
+                    if not i.ok:
+                        raise i.error
+                    if not i.result:
+                        if assets[i.item] is None:
+                            raise ValueError(f'The asset {i.item} is neither in the project nor on the asset host.')
+                        missing.append(i.item)
+            async def upload(md5ext):
+                data = await loop.run_in_executor(pool, zf.read, assets[md5ext])
+                result = await api.uploadFile(*md5ext.rsplit('.', 1), data)
+                if not await api.hasScratchAsset(md5ext):
+                    raise RuntimeError(f'The asset {md5ext} is not on the asset host after uploading it: {result}')
+                return result
+            done = 0
+            async with contextlib.aclosing(api.gatherMany(upload, missing, concurrency)) as results:
+                async for i in results:
+                    if not i.ok:
+                        raise i.error
+                    done += 1
+                    if progress:
+                        progress(done, len(missing))
+        code = await asyncio.to_thread(json.dumps, project, ensure_ascii = False, separators = (',', ':'))
+    finally:
+        zf.close()
+    if title is None:
+        title = os.path.splitext(os.path.basename(path))[0] if isinstance(path, str) else 'Scratch Project'
+    options = {} if thumbnail is None else {'thumbnail' : thumbnail}
+    result = await api.submitWork(code, 'Scratch', publish, title = title, description = description, fork = fork, workId = workId, **options)
+    return {'result' : result, 'assets' : len(assets), 'uploaded' : missing}
+
+def _loadManifest(path : str) -> dict:
+    manifest = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding = 'utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                manifest[entry.get('id')] = entry
+    return manifest
+
+def _compactManifest(path : str, manifest : dict):
+    with open(path + '.tmp', 'w', encoding = 'utf-8') as f:
+        for entry in manifest.values():
+            f.write(json.dumps(entry, ensure_ascii = False) + '\n')
+    os.replace(path + '.tmp', path)
+
+async def ArchiveWorks(path : str,
+                       userIds : Union[list[str], tuple[str], set[str]] = (),
+                       query : dict = None,
+                       api : AsyncIcodeAPI = None,
+                       assetStore : AssetStore = None,
+                       concurrency : int = 8,
+                       assetConcurrency : int = 32,
+                       manifestName : str = 'manifest.jsonl',
+                       progress = None,
+                       executor : concurrent.futures.Executor = None) -> dict:
+    '''
+    Mirror all works of some users, or of a `getWorks` query, into a local corpus in `path`.
+
+    `query` is the keyword arguments of `iterWorks`, like `{'keyword': 'minecraft', 'codeLanguage': 'scratch'}`.
+
+    Listing, work detail and asset download run at the same time, at most `concurrency` works
+    and `assetConcurrency` assets over all works at once. Works are saved as `{workId}.sb3` or `{workId}.py`.
+
+    Every saved work is appended to the manifest (a JSON line per work) once its file is complete, so a stopped run can be resumed.
+    A work failing to update keeps its old file and its old manifest entry.
+    A work whose `updateTimeStr` is the same as in the manifest is skipped.
+    `progress(workId, status)` is called after each work, the status is "saved", "skipped" or "failed".
+    The work details are decoded in threads, `executor` runs `ScratchManifest` for every Scratch work, see `DownloadWork`.
+
+    This function will return a dict, and the dict always be like:
+    ```python
+    {
+        'saved': int,
+        'skipped': int,
+        'failed': dict  # workId: error
+    }
+    ```
+    '''
+    if api == None:
+        api = AsyncIcodeAPI(assetStore = assetStore)
+        close = 1
     else:
-        raise TypeError("Don't support to download blocky works")
-    if close:
-        await api.closeClient()
+        close = 0
+    os.makedirs(path, exist_ok = True)
+    manifestPath = os.path.join(path, manifestName)
+    manifest = _loadManifest(manifestPath)
+    getAsset = _assetGetter(api, assetStore, asyncio.Semaphore(assetConcurrency))
+    async def listWorks():
+        seen = set()
+        sources = [api.iterPersonWorks(i) for i in userIds]
+        if query is not None:
+            sources.append(api.iterWorks(**query))
+        for source in sources:
+            async for i in source:
+                if (workId := i.get('id')) not in seen:
+                    seen.add(workId)
+                    yield workId
+    async def archiveOne(workId):
+        dt = await _workDetail(api, workId, False)
+        entry = manifest.get(workId)
+        if entry and entry.get('updateTimeStr') == dt.get('updateTimeStr') and os.path.exists(os.path.join(path, entry.get('file'))):
+            return None
+        filePath = await _saveWork(api, dt, path, getAsset, assetConcurrency, fileName = workId, executor = executor)
+        return {
+            'id' : workId,
+            'title' : dt.get('title'),
+            'userId' : dt.get('userId'),
+            'codeLanguage' : dt.get('codeLanguage'),
+            'updateTimeStr' : dt.get('updateTimeStr'),
+            'file' : os.path.basename(filePath)
+        }
+    result = {'saved' : 0, 'skipped' : 0, 'failed' : {}}
+    try:
+        with open(manifestPath, 'a', encoding = 'utf-8') as f:
+            async with contextlib.aclosing(api.gatherMany(archiveOne, listWorks(), concurrency)) as results:
+                async for i in results:
+                    if not i.ok:
+                        result['failed'][i.item] = i.error
+                        status = 'failed'
+                    elif i.result is None:
+                        result['skipped'] += 1
+                        status = 'skipped'
+                    else:
+                        manifest[i.item] = i.result
+                        f.write(json.dumps(i.result, ensure_ascii = False) + '\n')
+                        f.flush()
+                        result['saved'] += 1
+                        status = 'saved'
+                    if progress:
+                        progress(i.item, status)
+        _compactManifest(manifestPath, manifest)
+    finally:
+        if close:
+            await api.closeClient()
+    return result
 
-async def ViewNumMaker(workId : str, num : int = 5000, api : AsyncIcodeAPI = None):
+async def ViewNumMaker(workId : str, num : int = 5000, api : AsyncIcodeAPI = None, concurrency : int = 50):
     '''
     Let your work's viewNum become more and more!!
     '''
@@ -91,12 +417,9 @@ async def ViewNumMaker(workId : str, num : int = 5000, api : AsyncIcodeAPI = Non
         close = 1
     else:
         close = 0
-    tasks = []
-    print('Adding Tasks...')
-    for i in range(num):
-        tasks.append(asyncio.create_task(api.getWorkDetail(workId)))
     print('Start Waiting')
-    await asyncio.wait(tasks)
+    async for i in api.gatherMany(api.getWorkDetail, itertools.repeat(workId, num), concurrency):
+        pass
     if close:
         await api.closeClient()
 
@@ -150,15 +473,19 @@ def SingSong(workId : str, songWords : str, api : IcodeAPI):
 async def CommentsCleaner(workId : str, 
                           api : AsyncIcodeAPI,
                           page : Union[list[int], tuple[int], set[int]] = ALL_PAGES,
-                          getNum : int = 20):
+                          getNum : int = 20,
+                          concurrency : int = 10):
+    '''
+    Delete the comments of a work, at most `concurrency` deletes at the same time.
+    '''
     if page != ALL_PAGES:
         comments = []
         for i in page:
             comments += await api.getWorkComments(workId, page = i, getNum = getNum)
     else:
-        comments = await api.getWorkComments(workId, page = 1, getNum = INFINITY)
+        comments = [i async for i in api.iterComments(workId, getNum = getNum)]
     if comments == []:
         return False
-    tasks = [asyncio.create_task(api.deleteComment(i.get('id'))) for i in comments]
-    await asyncio.wait(tasks)
+    async for i in api.gatherMany(api.deleteComment, [i.get('id') for i in comments], concurrency):
+        pass
     return True
\ No newline at end of file
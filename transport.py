@@ -0,0 +1,117 @@
+'''
+icodeapi transport.
+
+The endpoint table of icodeshequ, used by the request engine of IcodeAPI and AsyncIcodeAPI.
+'''
+
+ICODESHEQU = 'icodeshequ.youdao.com'
+ICODE = 'icode.youdao.com'
+ASSET_HOST = 'ydschool-online.nosdn.127.net'
+LOGIN_HOST = 'icodecontest-online-api.youdao.com'
+UPLOAD_HOST = 'tiku-outside.youdao.com'
+
+RAW = object()
+EXISTS = object()
+
+class Endpoint():
+    '''
+    An API endpoint.
+
+    `path` can have `{}` fields, they are filled before the `query` parameters.
+    `key` is the key of the result in the response json, None for the whole json, `RAW` for the response bytes,
+    `EXISTS` for whether the resource exists (the response is not 404).
+    `content` is the default request body.
+    '''
+    __slots__ = ('name', 'method', 'host', 'path', 'query', 'key', 'login', 'content', 'url', 'template')
+
+    def __init__(self, name : str, method : str, host : str, path : str, query : tuple = (), key = None, login : bool = False, content : bytes = None):
+        self.name = name
+        self.method = method
+        self.host = host
+        self.path = path
+        self.query = query
+        self.key = key
+        self.login = login
+        self.content = content
+        self.url = f'https://{host}{path}'
+        self.template = self.url + ('?' + '&'.join(f'{i}={{}}' for i in query) if query else '')
+
+    def format(self, *values) -> str:
+        '''
+        Build the url, `values` are the path fields and then the query parameters.
+        '''
+        return self.template.format(*values) if values else self.template
+
+    def __repr__(self):
+        return f'Endpoint({self.name!r}, {self.method} {self.url})'
+
+class Call():
+    '''
+    A prepared request of an endpoint.
+
+    `cacheKey` is the key in the response cache, the cache is only read if `cacheRead`.
+    `invalidate` is `(workId, me)`, the cached results changed by the call, see `IcodeAPI._invalidate`.
+    `fields` are the only fields decoded from the result, see `codec.JSONDecoder.decode`.
+    `record` is the type the result is decoded into, see `records`, None for dicts.
+    `params` are the arguments naming what the call is about, like `{'workId': workId}`, see `hooks.Event.params`.
+    '''
+    __slots__ = ('endpoint', 'url', 'json', 'content', 'headers', 'cacheKey', 'cacheRead', 'coalesce', 'invalidate', 'fields', 'record', 'params')
+
+    def __init__(self, endpoint : Endpoint, url : str, json = None, content = None, headers : dict = None,
+                 cacheKey : tuple = None, cacheRead : bool = True, coalesce : bool = True, invalidate : tuple = None, fields : tuple = None, record : type = None,
+                 params : dict = None):
+        self.endpoint = endpoint
+        self.url = url
+        self.json = json
+        self.content = endpoint.content if content is None else content
+        self.headers = headers
+        self.cacheKey = cacheKey
+        self.cacheRead = cacheRead
+        self.coalesce = coalesce
+        self.invalidate = invalidate
+        self.fields = fields
+        self.record = record
+        self.params = params
+
+    def __repr__(self):
+        return f'Call({self.endpoint.method} {self.url})'
+
+ENDPOINTS = {i.name : i for i in (
+    Endpoint('login', 'GET', LOGIN_HOST, '/api/user/info'),
+    Endpoint('getWorkDetail', 'GET', ICODESHEQU, '/api/works/detail', ('id', 'addBrowseNum'), 'data'),
+    Endpoint('getWorkComments', 'GET', ICODESHEQU, '/api/works/comment/list', ('id', 'page', 'size'), 'dataList'),
+    Endpoint('getMoreWorks', 'GET', ICODESHEQU, '/api/user/more_works/list', ('userId', 'currentWorksId'), 'dataList'),
+    Endpoint('getWorks', 'GET', ICODESHEQU, '/api/index/works/list', ('page', 'size', 'sortType', 'theme', 'codeLanguage', 'keyword'), 'dataList'),
+    Endpoint('getMyWorks', 'GET', ICODESHEQU, '/api/user/works/list', ('page', 'size', 'status', 'theme', 'codeLanguage', 'keyword'), 'dataList', True),
+    Endpoint('getWorkSubmitInfo', 'GET', ICODE, '/api/work/get', ('id',)),
+    Endpoint('getPersonInfo', 'GET', ICODESHEQU, '/api/user/index/hisStatics', ('userId',), 'data'),
+    Endpoint('getPersonWorks', 'GET', ICODESHEQU, '/api/user/works/hisWorksList', ('page', 'size', 'userId'), 'dataList'),
+    Endpoint('getPersonEnshrines', 'GET', ICODESHEQU, '/api/user/works/hisEnshrines', ('page', 'size', 'userId'), 'dataList'),
+    Endpoint('getReplies', 'GET', ICODESHEQU, '/api/works/reply/list', ('commentId', 'page', 'size'), 'dataList'),
+    Endpoint('getMessages.reply', 'GET', ICODESHEQU, '/api/user/message/commentMessage', ('page', 'size'), 'dataList', True),
+    Endpoint('getMessages.enshrine', 'GET', ICODESHEQU, '/api/user/message/enshrinesMessage', ('page', 'size'), 'dataList', True),
+    Endpoint('getMessages.system', 'GET', ICODESHEQU, '/api/user/message/systemMessage', ('page', 'size'), 'dataList', True),
+    Endpoint('getScratchAsset', 'GET', ASSET_HOST, '/svg/{}', (), RAW),
+    Endpoint('hasScratchAsset', 'HEAD', ASSET_HOST, '/svg/{}', (), EXISTS),
+    Endpoint('comment', 'POST', ICODESHEQU, '/api/works/comment', (), None, True),
+    Endpoint('like', 'POST', ICODESHEQU, '/api/works/like', ('id', 'type'), None, True, 'IcodeAPI: Like request'.encode('utf-8')),
+    Endpoint('enshrine', 'POST', ICODESHEQU, '/api/user/works/enshrine', ('worksId',), None, True, 'IcodeAPI: Enshrine request'.encode('utf-8')),
+    Endpoint('cancelEnshrine', 'POST', ICODESHEQU, '/api/user/works/cancelEnshrine', ('worksId',), None, True, 'IcodeAPI: Enshrine request'.encode('utf-8')),
+    Endpoint('report', 'POST', ICODESHEQU, '/api/works/report', (), None, True),
+    Endpoint('submitScratch', 'POST', ICODE, '/api/work/submit', (), None, True),
+    Endpoint('saveWork', 'POST', ICODESHEQU, '/api/works/save', (), None, True),
+    Endpoint('publishWork', 'POST', ICODESHEQU, '/api/works/publish', ('publishType',), None, True),
+    Endpoint('deleteWork', 'DELETE', ICODESHEQU, '/api/works/delete', ('id',), None, True),
+    Endpoint('updateIntro', 'POST', ICODESHEQU, '/api/user/updateIntro', (), None, True),
+    Endpoint('reply', 'POST', ICODESHEQU, '/api/works/reply', (), None, True),
+    Endpoint('deleteComment', 'POST', ICODESHEQU, '/api/works/comment/delete', ('commentId',), None, True, 'IcodeAPI delete comment'.encode('utf-8')),
+    Endpoint('deleteReply', 'POST', ICODESHEQU, '/api/works/reply/delete', ('replyId',), None, True, 'IcodeAPI delete reply'.encode('utf-8')),
+    Endpoint('deleteMessage', 'POST', ICODESHEQU, '/api/user/message/deleteComment', (), None, True),
+    Endpoint('uploadFile', 'POST', UPLOAD_HOST, '/nos/scratch/asset/{}.{}/', (), None, True),
+    Endpoint('praiseComment', 'POST', ICODESHEQU, '/api/works/comment/praise', ('commentId',), None, True, 'IcodeAPI: praiseComment'.encode('utf-8')),
+    Endpoint('cancelPraiseComment', 'POST', ICODESHEQU, '/api/works/comment/cancelPraise', ('commentId',), None, True, 'IcodeAPI: praiseComment'.encode('utf-8')),
+    Endpoint('praiseReply', 'POST', ICODESHEQU, '/api/works/reply/praise', ('replyId',), None, True, 'IcodeAPI: praiseComment'.encode('utf-8')),
+    Endpoint('cancelPraiseReply', 'POST', ICODESHEQU, '/api/works/reply/cancelPraise', ('replyId',), None, True, 'IcodeAPI: praiseComment'.encode('utf-8')),
+    Endpoint('readMessage', 'PUT', ICODESHEQU, '/api/user/message/read', ('id',), None, True),
+    Endpoint('readAllMessages', 'POST', ICODESHEQU, '/api/user/message/readAll', (), None, True),
+)}